@@ -1,2 +1,13 @@
-from streebog import Streebog, hash_256, hash_512
-__all__ = ["Streebog", "hash_256", "hash_512"]
\ No newline at end of file
+from streebog import (
+    Streebog,
+    hash_256,
+    hash_512,
+    hash_fd,
+    hash_file,
+    streebog256,
+    streebog512,
+)
+__all__ = [
+    "Streebog", "hash_256", "hash_512", "hash_fd", "hash_file",
+    "streebog256", "streebog512",
+]
\ No newline at end of file
@@ -0,0 +1,175 @@
+"""
+async_streebog.py - Хэширование ГОСТ 34.11-2018 без блокировки цикла asyncio
+
+Streebog.update на большом фрагменте занимает процессор на сотни
+миллисекунд, и всё это время цикл событий стоит. AsyncStreebog
+снимает проблему одним из двух способов:
+
+- бюджет работы: данные обрабатываются порциями по blocks_per_yield
+  блоков, между порциями управление возвращается циклу;
+- исполнитель: update выполняется в пуле потоков или процессов
+  (для пула процессов состояние передаётся через state_bytes()).
+
+hash_stream читает поток следующей порцией только после того, как
+хэширование предыдущей закончено, поэтому память ограничена размером
+порции при любой скорости сокета.
+"""
+
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Optional
+
+from streebog import Streebog
+
+
+# Блоков между возвратами управления циклу (64 блока ≈ 3-4 мс)
+DEFAULT_BLOCKS_PER_YIELD = 64
+
+# Размер порции чтения в hash_stream
+DEFAULT_CHUNK_SIZE = 64 << 10
+
+
+def _update_state(state: bytes, data: bytes) -> bytes:
+    """update() в дочернем процессе: состояние туда и обратно"""
+    hasher = Streebog.from_state(state)
+    hasher.update(data)
+    return hasher.state_bytes()
+
+
+class AsyncStreebog:
+    """
+    Асинхронная обёртка над Streebog.
+
+    Args:
+        out_bits: 256 или 512
+        blocks_per_yield: Бюджет работы — блоков между возвратами управления
+        executor: Пул потоков или процессов; если задан, update()
+            выполняется в нём, а не порциями в цикле событий
+
+    Example:
+        >>> hasher = AsyncStreebog(256)
+        >>> await hasher.update(payload)
+        >>> hasher.hexdigest()
+    """
+
+    def __init__(self, out_bits: int = 512,
+                 blocks_per_yield: int = DEFAULT_BLOCKS_PER_YIELD,
+                 executor: Optional[Executor] = None):
+        if blocks_per_yield < 1:
+            raise ValueError("blocks_per_yield должно быть >= 1")
+
+        self._hasher = Streebog(out_bits)
+        self._slice = blocks_per_yield * 64
+        self._executor = executor
+        self._lock = asyncio.Lock()
+
+    @property
+    def name(self) -> str:
+        return self._hasher.name
+
+    @property
+    def digest_size(self) -> int:
+        return self._hasher.digest_size
+
+    @property
+    def block_size(self) -> int:
+        return self._hasher.block_size
+
+    async def update(self, data) -> None:
+        """
+        Добавляет данные в хэш, не блокируя цикл событий.
+
+        Параллельные вызовы update() выполняются по очереди.
+        """
+        async with self._lock:
+            if self._executor is not None:
+                await self._update_in_executor(data)
+                return
+
+            with memoryview(data) as raw, raw.cast('B') as view:
+                for start in range(0, len(view), self._slice):
+                    self._hasher.update(view[start:start + self._slice])
+                    if start + self._slice < len(view):
+                        await asyncio.sleep(0)
+
+    async def _update_in_executor(self, data) -> None:
+        loop = asyncio.get_running_loop()
+        if isinstance(self._executor, ProcessPoolExecutor):
+            state = await loop.run_in_executor(
+                self._executor, _update_state, self._hasher.state_bytes(), bytes(data)
+            )
+            self._hasher = Streebog.from_state(state)
+        else:
+            await loop.run_in_executor(self._executor, self._hasher.update, data)
+
+    def digest(self) -> bytes:
+        return self._hasher.digest()
+
+    def hexdigest(self) -> str:
+        return self._hasher.hexdigest()
+
+    def copy(self) -> "AsyncStreebog":
+        clone = AsyncStreebog.__new__(AsyncStreebog)
+        clone._hasher = self._hasher.copy()
+        clone._slice = self._slice
+        clone._executor = self._executor
+        clone._lock = asyncio.Lock()
+        return clone
+
+
+async def hash_stream(reader, out_bits: int = 512,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      blocks_per_yield: int = DEFAULT_BLOCKS_PER_YIELD,
+                      executor: Optional[Executor] = None) -> bytes:
+    """
+    Хэширует асинхронный поток до конца.
+
+    Args:
+        reader: Объект с корутиной read(n) (asyncio.StreamReader)
+            или асинхронный итератор фрагментов
+        out_bits: 256 или 512
+        chunk_size: Размер порции чтения (граница потребления памяти)
+        blocks_per_yield: Бюджет работы между возвратами управления
+        executor: Пул для update() (см. AsyncStreebog)
+
+    Returns:
+        Хэш-код (32 или 64 байта)
+    """
+    hasher = AsyncStreebog(out_bits, blocks_per_yield, executor)
+
+    if hasattr(reader, 'read'):
+        while True:
+            chunk = await reader.read(chunk_size)
+            if not chunk:
+                break
+            await hasher.update(chunk)
+    else:
+        async for chunk in reader:
+            await hasher.update(chunk)
+
+    return hasher.digest()
+
+
+# ============================================================================
+# САМОТЕСТИРОВАНИЕ
+# ============================================================================
+
+def _self_check() -> None:
+    """Сверка с синхронным Streebog"""
+    from streebog import hash_512
+
+    data = bytes(range(256)) * 20
+
+    async def main():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await hash_stream(reader, 512, chunk_size=777, blocks_per_yield=3)
+
+    assert asyncio.run(main()) == hash_512(data)
+
+    print("✓ Асинхронное хэширование совпадает с hash_512")
+
+
+if __name__ == "__main__":
+    _self_check()
@@ -0,0 +1,241 @@
+"""
+batch.py - Пакетное хэширование ГОСТ 34.11-2018 на NumPy
+
+Хэширует много сообщений одновременно: состояния всех сообщений
+("дорожек") упакованы в массив (n, 8) uint64, и g, E и ключевое
+расписание выполняются для всех дорожек сразу. LPS — это выборка
+(gather) из таблиц tables.LPS_TABLES.
+
+Слово j дорожки — big-endian слово из байтов 8j..8j+7 вектора, как и
+в int_compression.py. Сообщения с одинаковым числом полных блоков
+группируются и обрабатываются вместе.
+
+NumPy — необязательная зависимость. hash_256_batch / hash_512_batch
+работают через реестр backends.py: на машине без NumPy (или при явном
+выборе другой реализации) сообщения хэшируются по одному.
+"""
+
+from typing import Iterable, Optional
+
+from backends import hash_batch
+from constants import C_CONSTANTS, IV_256, IV_512
+from tables import LPS_TABLES
+from utils import MASK_512, bytes_to_int, int_to_bytes, pad_last_block
+
+try:
+    import numpy as np
+except ImportError:  # NumPy не установлен
+    np = None
+
+
+HAVE_NUMPY = np is not None
+
+# Максимум дорожек, обрабатываемых за один проход (ограничивает память)
+MAX_LANES = 4096
+
+
+if HAVE_NUMPY:
+    # Таблицы T_0...T_7 одним массивом: T_k[x] = _TABLES_FLAT[256k + x]
+    _TABLES_FLAT = np.array(
+        [word for table in LPS_TABLES for word in table], dtype=np.uint64
+    )
+    # Смещения таблиц для индексов формы (n, k, j)
+    _TABLE_OFFSETS = (np.arange(8, dtype=np.intp) * 256).reshape(1, 8, 1)
+    _C_WORDS = [
+        np.frombuffer(c, dtype='>u8').astype(np.uint64) for c in C_CONSTANTS
+    ]
+    # Массивы общие для всех потоков — запрещаем запись в них
+    for _array in (_TABLES_FLAT, _TABLE_OFFSETS, *_C_WORDS):
+        _array.flags.writeable = False
+    del _array
+
+
+# ============================================================================
+# ПРЕОБРАЗОВАНИЯ НАД МАССИВАМИ (n, 8)
+# ============================================================================
+
+def _to_words(data: bytes, n: int) -> "np.ndarray":
+    """Упаковывает n векторов по 64 байта в массив (n, 8) uint64"""
+    return np.frombuffer(data, dtype='>u8').astype(np.uint64).reshape(n, 8)
+
+
+def _from_words(words: "np.ndarray") -> bytes:
+    """Обратное преобразование: массив (n, 8) → n·64 байт"""
+    return words.astype('>u8').tobytes()
+
+
+def _lps(a: "np.ndarray") -> "np.ndarray":
+    """
+    LPS для всех дорожек: out[:, j] = ⊕_k T_k[байт j слова k].
+
+    Args:
+        a: Массив (n, 8) uint64
+
+    Returns:
+        Массив (n, 8) uint64
+    """
+    n = a.shape[0]
+    # b[:, k, j] — байт j (big-endian) слова k
+    b = a.astype('>u8').view(np.uint8).reshape(n, 8, 8)
+    gathered = _TABLES_FLAT[b + _TABLE_OFFSETS]
+    return np.bitwise_xor.reduce(gathered, axis=1)
+
+
+def _g(N: "np.ndarray", h: "np.ndarray", m: "np.ndarray") -> "np.ndarray":
+    """
+    Функция сжатия g_N(h, m) = E(LPS(h ⊕ N), m) ⊕ h ⊕ m для всех дорожек.
+
+    N может быть массивом (n, 8) или (1, 8) — тогда он общий для всех дорожек.
+    """
+    K = _lps(h ^ N)
+    state = m
+    for c in _C_WORDS:
+        state = _lps(state ^ K)
+        K = _lps(K ^ c)
+    return state ^ K ^ h ^ m
+
+
+def _ints_to_words(values: list[int]) -> "np.ndarray":
+    """Список 512-битных чисел → массив (n, 8)"""
+    return _to_words(b"".join(int_to_bytes(v, 64) for v in values), len(values))
+
+
+# ============================================================================
+# ХЭШИРОВАНИЕ ГРУППЫ СООБЩЕНИЙ С ОДИНАКОВЫМ ЧИСЛОМ БЛОКОВ
+# ============================================================================
+
+def _hash_group(messages: list[bytes], blocks: int, iv: bytes) -> list[bytes]:
+    """
+    Хэширует сообщения, в каждом из которых ровно `blocks` полных блоков.
+
+    Returns:
+        Список 64-байтовых состояний h после финализации
+    """
+    n = len(messages)
+    h = np.tile(_to_words(iv, 1), (n, 1))
+    sigmas = [0] * n
+
+    if blocks:
+        full = np.frombuffer(
+            b"".join(msg[:64 * blocks] for msg in messages), dtype='>u8'
+        ).astype(np.uint64).reshape(n, blocks, 8)
+
+        for i in range(blocks):
+            # N одинаков для всех дорожек: 512·i
+            N = _ints_to_words([512 * i])
+            h = _g(N, h, full[:, i])
+
+        # Σ считается на целых числах: одна сумма на сообщение
+        for lane, msg in enumerate(messages):
+            sigmas[lane] = sum(
+                bytes_to_int(msg[off:off + 64]) for off in range(0, 64 * blocks, 64)
+            )
+
+    tails = [pad_last_block(msg[64 * blocks:]) for msg in messages]
+    h = _g(_ints_to_words([512 * blocks]), h, _to_words(b"".join(tails), n))
+
+    lengths = [(512 * blocks + 8 * (len(msg) - 64 * blocks)) & MASK_512
+               for msg in messages]
+    sigmas = [(s + bytes_to_int(t)) & MASK_512 for s, t in zip(sigmas, tails)]
+
+    zero = np.zeros((1, 8), dtype=np.uint64)
+    h = _g(zero, h, _ints_to_words(lengths))
+    h = _g(zero, h, _ints_to_words(sigmas))
+
+    out = _from_words(h)
+    return [out[i * 64:(i + 1) * 64] for i in range(n)]
+
+
+def _hash_batch(messages: Iterable[bytes], out_bits: int,
+                max_lanes: Optional[int] = None) -> list[bytes]:
+    if not HAVE_NUMPY:
+        raise ImportError("Пакетное хэширование требует NumPy")
+
+    if out_bits not in (256, 512):
+        raise ValueError(f"out_bits должен быть 256 или 512, получено {out_bits}")
+    if max_lanes is None:
+        max_lanes = MAX_LANES
+    elif max_lanes < 1:
+        raise ValueError(f"max_lanes должен быть положительным, получено {max_lanes}")
+
+    messages = [bytes(msg) for msg in messages]
+    iv = IV_512 if out_bits == 512 else IV_256
+
+    # Группировка по числу полных блоков
+    groups: dict[int, list[int]] = {}
+    for index, msg in enumerate(messages):
+        groups.setdefault(len(msg) // 64, []).append(index)
+
+    results: list[bytes] = [b""] * len(messages)
+    for blocks, indices in groups.items():
+        for start in range(0, len(indices), max_lanes):
+            chunk = indices[start:start + max_lanes]
+            digests = _hash_group([messages[i] for i in chunk], blocks, iv)
+            for index, digest in zip(chunk, digests):
+                results[index] = digest[:32] if out_bits == 256 else digest
+
+    return results
+
+
+# ============================================================================
+# ПУБЛИЧНЫЙ API
+# ============================================================================
+
+def hash_512_batch(messages: Iterable[bytes],
+                   max_lanes: Optional[int] = None) -> list[bytes]:
+    """
+    Вычисляет 512-битные хэши многих сообщений за один вызов.
+
+    Результаты совпадают с streebog.hash_512 для каждого сообщения.
+
+    Args:
+        messages: Итерируемый набор сообщений
+        max_lanes: Максимум сообщений в одном векторном проходе
+
+    Returns:
+        Список хэшей (по 64 байта) в порядке входных сообщений
+
+    Raises:
+        ValueError: Если max_lanes меньше 1
+    """
+    return hash_batch(messages, 512, max_lanes)
+
+
+def hash_256_batch(messages: Iterable[bytes],
+                   max_lanes: Optional[int] = None) -> list[bytes]:
+    """
+    Вычисляет 256-битные хэши многих сообщений за один вызов.
+
+    Результаты совпадают с streebog.hash_256 для каждого сообщения.
+
+    Args:
+        messages: Итерируемый набор сообщений
+        max_lanes: Максимум сообщений в одном векторном проходе
+
+    Returns:
+        Список хэшей (по 32 байта) в порядке входных сообщений
+
+    Raises:
+        ValueError: Если max_lanes меньше 1
+    """
+    return hash_batch(messages, 256, max_lanes)
+
+
+# ============================================================================
+# САМОТЕСТИРОВАНИЕ
+# ============================================================================
+
+def _self_check() -> None:
+    """Сверка пакетного хэширования с streebog.hash_*"""
+    import os
+    from streebog import hash_256, hash_512
+
+    messages = [os.urandom(n) for n in (0, 1, 32, 63, 64, 65, 127, 128, 200, 200)]
+    assert hash_512_batch(messages) == [hash_512(m) for m in messages]
+    assert hash_256_batch(messages) == [hash_256(m) for m in messages]
+
+    print("✓ Пакетное хэширование совпадает с потоковым")
+
+
+if __name__ == "__main__":
+    _self_check()
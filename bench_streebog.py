@@ -0,0 +1,294 @@
+"""
+bench_streebog.py - Бенчмарки ГОСТ 34.11-2018 (pytest-benchmark)
+
+Покрывает примитивы (l, L, S, P, LPS), ключевое расписание, E, g
+и полное хэширование hash_256/hash_512 для 0 B, 63 B, 64 B, 1 KB,
+1 MB, а также потоковое хэширование нечётными порциями — для каждой
+реализации из backends.py, — масштабирование hash_many_threads по
+числу потоков и время холодного старта интерпретатора с import
+streebog. Для каждого замера в extra_info пишутся blocks_per_sec
+и MB_per_sec, в конце сессии печатается сводка.
+
+Файл не подходит под шаблон test_*.py и не запускается вместе с
+тестами; запуск и сравнение с сохранённым эталоном:
+
+    python -m pytest bench_streebog.py --benchmark-save=baseline
+    python -m pytest bench_streebog.py --benchmark-compare \\
+        --benchmark-compare-fail=mean:15%
+
+Эталоны (JSON) лежат в .benchmarks/; замедление больше порога
+(здесь 15% по среднему) завершает запуск с ошибкой.
+
+Сравнение сборок с GIL и без него — группа threads, запущенная
+обоими интерпретаторами (в extra_info пишутся gil_enabled и версия):
+
+    python3.13  -m pytest bench_streebog.py -k threads --benchmark-save=gil
+    python3.13t -m pytest bench_streebog.py -k threads --benchmark-save=nogil
+    pytest-benchmark compare --group-by=name
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+import backends
+from compression import E, key_schedule
+from int_compression import E_int, LPS_int, key_schedule_int
+from parallel import default_workers, gil_enabled, hash_many_threads
+from primitives import L, LPS, P, S, l
+from streebog import Streebog, hash_256, hash_512
+from tables import LPS_table
+from utils import MASK_512, add_mod_2n_512, bytes_to_int, int_to_bytes
+
+
+SIZES = (0, 63, 64, 1 << 10, 1 << 20)
+
+# Порции для потокового режима (не кратны 64) и объём потока
+STREAM_CHUNKS = (1, 63, 65, 1021, 4099)
+STREAM_BYTES = 64 << 10
+
+# Эталонная реализация на 1 MB работает минуты — пропускаем
+MAX_BYTES = {"reference": 64 << 10}
+
+BACKENDS = backends.available_backends()
+
+_BLOCK = bytes(range(64))
+_WORD = _BLOCK[:8]
+_INT = int.from_bytes(_BLOCK, 'big')
+
+_report: list[tuple[str, str, float, float]] = []
+
+
+# ============================================================================
+# ИНФРАСТРУКТУРА
+# ============================================================================
+
+def _measure(benchmark, func, *args, nbytes: int, blocks: int):
+    """Запускает замер и записывает пропускную способность"""
+    # Долгие замеры — несколько раундов вместо калибровки
+    if nbytes >= 64 << 10:
+        result = benchmark.pedantic(func, args, rounds=3, iterations=1)
+    else:
+        result = benchmark(func, *args)
+
+    stats = getattr(benchmark, 'stats', None)
+    if stats is not None:
+        mean = stats.stats.mean
+        blocks_per_sec = blocks / mean
+        mb_per_sec = nbytes / mean / 1e6
+        benchmark.extra_info["blocks_per_sec"] = blocks_per_sec
+        benchmark.extra_info["MB_per_sec"] = mb_per_sec
+        _report.append((benchmark.group or "", benchmark.name,
+                        blocks_per_sec, mb_per_sec))
+    return result
+
+
+@pytest.fixture(scope="module", autouse=True)
+def throughput_report(request):
+    """Сводка blocks/s и MB/s по всем замерам модуля"""
+    yield
+    if not _report:
+        return
+    capture = request.config.pluginmanager.getplugin("capturemanager")
+    with capture.global_and_fixture_disabled():
+        print(f"\n{'group':<14} {'benchmark':<48} {'blocks/s':>12} {'MB/s':>10}")
+        for group, name, blocks_per_sec, mb_per_sec in _report:
+            print(f"{group:<14} {name:<48} {blocks_per_sec:>12,.0f}"
+                  f" {mb_per_sec:>10.3f}")
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    """Выбирает реализацию на время теста"""
+    selected = backends.set_backend(request.param)
+    yield selected
+    backends.set_backend(None)
+
+
+# ============================================================================
+# ПРИМИТИВЫ
+# ============================================================================
+
+@pytest.mark.benchmark(group="primitives")
+@pytest.mark.parametrize("func, arg", [
+    pytest.param(l, _WORD, id="l"),
+    pytest.param(L, _BLOCK, id="L"),
+    pytest.param(S, _BLOCK, id="S"),
+    pytest.param(P, _BLOCK, id="P"),
+])
+def test_primitive(benchmark, func, arg):
+    _measure(benchmark, func, arg, nbytes=len(arg), blocks=len(arg) / 64)
+
+
+@pytest.mark.benchmark(group="LPS")
+@pytest.mark.parametrize("func, arg", [
+    pytest.param(LPS, _BLOCK, id="reference"),
+    pytest.param(LPS_table, _BLOCK, id="table"),
+    pytest.param(LPS_int, _INT, id="int"),
+])
+def test_lps(benchmark, func, arg):
+    _measure(benchmark, func, arg, nbytes=64, blocks=1)
+
+
+@pytest.mark.benchmark(group="key_schedule")
+@pytest.mark.parametrize("func, arg", [
+    pytest.param(key_schedule, _BLOCK, id="table"),
+    pytest.param(key_schedule_int, _INT, id="int"),
+])
+def test_key_schedule(benchmark, func, arg):
+    _measure(benchmark, func, arg, nbytes=64, blocks=1)
+
+
+@pytest.mark.benchmark(group="E")
+@pytest.mark.parametrize("func, args", [
+    pytest.param(E, (_BLOCK, _BLOCK), id="table"),
+    pytest.param(E_int, (_INT, _INT), id="int"),
+])
+def test_e(benchmark, func, args):
+    _measure(benchmark, func, *args, nbytes=64, blocks=1)
+
+
+@pytest.mark.benchmark(group="g")
+def test_g(benchmark, backend):
+    _measure(benchmark, backend.g, _INT, _INT, _INT, nbytes=64, blocks=1)
+
+
+# ============================================================================
+# ПОЛНОЕ ХЭШИРОВАНИЕ
+# ============================================================================
+
+@pytest.mark.benchmark(group="hash")
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("func", [hash_256, hash_512], ids=["256", "512"])
+def test_hash(benchmark, backend, func, size):
+    if size > MAX_BYTES.get(backend.name, size):
+        pytest.skip(f"{backend.name}: {size} байт слишком долго")
+    message = bytes(i & 0xff for i in range(size))
+    _measure(benchmark, func, message, nbytes=size, blocks=size // 64 + 1)
+
+
+def _streaming_256(message: bytes) -> bytes:
+    """hash_256 без короткого пути: объект Streebog и его буфер"""
+    hasher = Streebog(256)
+    hasher.update(message)
+    return hasher.final()
+
+
+@pytest.mark.benchmark(group="short")
+@pytest.mark.parametrize("size", (0, 32, 63))
+@pytest.mark.parametrize("func", [
+    pytest.param(hash_256, id="short-path"),
+    pytest.param(_streaming_256, id="streaming"),
+])
+def test_short(benchmark, func, size):
+    _measure(benchmark, func, bytes(size), nbytes=size, blocks=1)
+
+
+@pytest.mark.benchmark(group="stream")
+@pytest.mark.parametrize("chunk", STREAM_CHUNKS)
+def test_stream(benchmark, backend, chunk):
+    data = bytes(i & 0xff for i in range(STREAM_BYTES))
+    pieces = [data[i:i + chunk] for i in range(0, len(data), chunk)]
+
+    def stream():
+        hasher = Streebog(512)
+        for piece in pieces:
+            hasher.update(piece)
+        return hasher.digest()
+
+    _measure(benchmark, stream, nbytes=STREAM_BYTES, blocks=STREAM_BYTES // 64 + 1)
+
+
+@pytest.mark.benchmark(group="batch")
+def test_batch(benchmark, backend):
+    messages = [bytes([i & 0xff]) * 64 for i in range(1024)]
+    _measure(benchmark, backends.hash_batch, messages, 256,
+             nbytes=64 * len(messages), blocks=2 * len(messages))
+
+
+# ============================================================================
+# ПОТОКИ (GIL И БЕЗ НЕГО)
+# ============================================================================
+
+THREAD_MESSAGES = 64
+THREAD_MESSAGE_BYTES = 16 << 10
+THREAD_WORKERS = sorted({1, 2, 4, default_workers()})
+
+
+@pytest.mark.benchmark(group="threads")
+@pytest.mark.parametrize("workers", THREAD_WORKERS)
+def test_threads(benchmark, workers):
+    messages = [bytes([i]) * THREAD_MESSAGE_BYTES for i in range(THREAD_MESSAGES)]
+    benchmark.extra_info["gil_enabled"] = gil_enabled()
+    benchmark.extra_info["python"] = sys.version.split()[0]
+    _measure(benchmark, hash_many_threads, messages, 256, workers,
+             nbytes=THREAD_MESSAGES * THREAD_MESSAGE_BYTES,
+             blocks=THREAD_MESSAGES * (THREAD_MESSAGE_BYTES // 64 + 1))
+
+
+# ============================================================================
+# УЧЁТ N И Σ
+# ============================================================================
+
+BOOKKEEPING_BYTES = 4 << 20
+
+
+def _null_g(N: int, h: int, m: int) -> int:
+    return h
+
+
+def _bookkeeping_bytes(view) -> None:
+    """Учёт как в исходной версии: bytes ↔ int и add_mod_2n_512 на каждый блок"""
+    N = Sigma = bytes(64)
+    for start in range(0, len(view), 64):
+        block = bytes(view[start:start + 64])
+        N = add_mod_2n_512(N, int_to_bytes(512, 64))
+        Sigma = add_mod_2n_512(Sigma, block)
+
+
+def _bookkeeping_per_block(view) -> None:
+    """Числа, но приведение по модулю на каждый блок"""
+    N = Sigma = 0
+    for start in range(0, len(view), 64):
+        m = bytes_to_int(view[start:start + 64])
+        N = (N + 512) & MASK_512
+        Sigma = (Sigma + m) & MASK_512
+
+
+def _bookkeeping_bulk(view) -> None:
+    """Streebog.update с пустой g: остаётся только учёт серии блоков"""
+    hasher = Streebog(512)
+    hasher._g = _null_g
+    hasher.update(view)
+
+
+@pytest.mark.benchmark(group="bookkeeping")
+@pytest.mark.parametrize("func", [
+    pytest.param(_bookkeeping_bytes, id="bytes-roundtrip"),
+    pytest.param(_bookkeeping_per_block, id="int-per-block"),
+    pytest.param(_bookkeeping_bulk, id="bulk"),
+])
+def test_bookkeeping(benchmark, func):
+    view = memoryview(bytes(BOOKKEEPING_BYTES))
+    _measure(benchmark, func, view, nbytes=BOOKKEEPING_BYTES,
+             blocks=BOOKKEEPING_BYTES // 64)
+
+
+# ============================================================================
+# ХОЛОДНЫЙ СТАРТ
+# ============================================================================
+
+@pytest.mark.benchmark(group="import")
+@pytest.mark.parametrize("code", [
+    pytest.param("pass", id="python"),
+    pytest.param("import streebog", id="import"),
+    pytest.param("import streebog; streebog.hash_256(b'')", id="first-hash"),
+    pytest.param("import cli", id="cli"),
+])
+def test_cold_start(benchmark, code):
+    command = [sys.executable, "-c", code]
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    benchmark.pedantic(subprocess.run, (command,), {"check": True, "cwd": cwd},
+                       rounds=20, iterations=1)
@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""
+cli.py - Командная строка для ГОСТ 34.11-2018 (Стрибог)
+
+Вывод совместим с coreutils (sha256sum и т.п.):
+
+    python -m streebog [-l 256|512] [-j N] [--tag] [ФАЙЛ]...
+    streebog256sum ФАЙЛ...      # ссылка на cli.py, длина по имени
+    streebog512sum ФАЙЛ...
+
+Без файлов (или с "-") хэшируется стандартный ввод. С -j N файлы
+распределяются по N процессам; порядок вывода всегда совпадает с
+порядком аргументов.
+
+Режим --check проверяет манифест из строк "<хэш>  <путь>". Манифест,
+записанный с --size, хранит ещё и размер файла ("<хэш>  <размер>  <путь>"):
+файлы с другим размером отбраковываются без чтения.
+
+С --cache ФАЙЛ хэши неизменившихся файлов берутся из кэша
+(digest_cache.py) без чтения файлов.
+"""
+
+import argparse
+import io
+import itertools
+import os
+import re
+import sys
+import time
+from typing import (
+    TYPE_CHECKING,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    TypeVar,
+    Union,
+)
+
+import parallel
+from parallel import FileResult, file_result
+from streebog import hash_fd
+
+if TYPE_CHECKING:
+    from digest_cache import DigestCache
+
+
+# ============================================================================
+# ФОРМАТ ВЫВОДА
+# ============================================================================
+
+def _default_bits(prog: str) -> int:
+    """Длина хэша по имени программы (streebog256sum → 256)"""
+    return 256 if '256' in prog else 512
+
+
+def _escape(name: str) -> tuple[str, str]:
+    """Экранирование имени файла как в coreutils: префикс '\\' и \\\\, \\n, \\r"""
+    if not any(c in name for c in '\\\n\r'):
+        return '', name
+    escaped = name.replace('\\', '\\\\').replace('\n', '\\n').replace('\r', '\\r')
+    return '\\', escaped
+
+
+def format_line(digest: bytes, name: str, out_bits: int,
+                tag: bool = False, binary: bool = False,
+                size: Optional[int] = None) -> str:
+    """
+    Строка результата для одного файла.
+
+    Args:
+        digest: Хэш-код
+        name: Имя файла ("-" для стандартного ввода)
+        out_bits: 256 или 512
+        tag: BSD-формат "STREEBOG256 (имя) = хэш"
+        binary: Маркер двоичного режима "*" перед именем
+        size: Размер файла для манифеста с размерами (--size)
+
+    Returns:
+        Строка без завершающего перевода строки
+    """
+    prefix, escaped = _escape(name)
+    if tag:
+        return f"{prefix}STREEBOG{out_bits} ({escaped}) = {digest.hex()}"
+    sized = f" {size} " if size is not None else ""
+    return f"{prefix}{digest.hex()} {sized}{'*' if binary else ' '}{escaped}"
+
+
+# ============================================================================
+# ХЭШИРОВАНИЕ СПИСКА ФАЙЛОВ
+# ============================================================================
+
+Result = Union[bytes, OSError]
+
+# Значение, которое in_order переупорядочивает, не меняя
+_T = TypeVar('_T')
+
+
+def _hash_one(name: str, out_bits: int) -> FileResult:
+    if name != '-':
+        return file_result(name, out_bits)
+    start = time.perf_counter()
+    try:
+        digest = hash_fd(sys.stdin.fileno(), out_bits)
+    except OSError as e:
+        return FileResult(None, e, 0, time.perf_counter() - start)
+    return FileResult(digest, None, 0, time.perf_counter() - start)
+
+
+def _iter_cached(names: list[str], out_bits: int, jobs: int,
+                 cache: "DigestCache") -> Iterator[tuple[int, FileResult]]:
+    """Отдаёт хэши из кэша, остальные файлы хэширует и запоминает"""
+    misses = []
+    stats = {}
+    for index, name in enumerate(names):
+        if name == '-':
+            misses.append(index)
+            continue
+        start = time.perf_counter()
+        try:
+            st = os.stat(name)
+        except OSError as e:
+            yield index, FileResult(None, e, 0, time.perf_counter() - start)
+            continue
+        digest = cache.lookup(st, out_bits)
+        if digest is not None:
+            yield index, FileResult(digest, None, st.st_size,
+                                    time.perf_counter() - start)
+        else:
+            stats[index] = st
+            misses.append(index)
+
+    hashed = iter_file_results([names[i] for i in misses], out_bits, jobs)
+    for position, result in hashed:
+        index = misses[position]
+        if result.digest is not None and index in stats:
+            cache.store(names[index], stats[index], out_bits, result.digest)
+        yield index, result
+
+
+def iter_file_results(names: list[str], out_bits: int, jobs: int = 1,
+                      cache: Optional["DigestCache"] = None
+                      ) -> Iterator[tuple[int, FileResult]]:
+    """
+    Хэширует файлы и выдаёт (индекс, FileResult) в порядке завершения.
+
+    При jobs > 1 файлы хэшируются в пуле процессов.
+    Стандартный ввод всегда читается в основном процессе.
+    С кэшем файлы, чей stat() не изменился, не читаются; кэш
+    читается и пополняется только в основном процессе.
+    """
+    if cache is not None:
+        yield from _iter_cached(names, out_bits, jobs, cache)
+        return
+
+    if jobs <= 1:
+        for index, name in enumerate(names):
+            yield index, _hash_one(name, out_bits)
+        return
+
+    indices = []
+    for index, name in enumerate(names):
+        if name == '-':
+            yield index, _hash_one(name, out_bits)
+        else:
+            indices.append(index)
+
+    results = parallel.iter_file_results(
+        [names[i] for i in indices], out_bits, workers=jobs
+    )
+    for position, result in results:
+        yield indices[position], result
+
+
+def in_order(results: Iterable[tuple[int, _T]],
+             ready: Optional[dict[int, _T]] = None) -> Iterator[tuple[int, _T]]:
+    """
+    Переупорядочивает (индекс, значение) по возрастанию индекса.
+
+    Завершившиеся раньше очереди результаты придерживаются до вывода
+    предыдущих. ready — заранее известные результаты.
+    """
+    ready = dict(ready or {})
+    next_index = 0
+    for index, value in results:
+        ready[index] = value
+        while next_index in ready:
+            yield next_index, ready.pop(next_index)
+            next_index += 1
+    for index in sorted(ready):
+        yield index, ready[index]
+
+
+def iter_digests(names: list[str], out_bits: int,
+                 jobs: int = 1) -> Iterator[tuple[str, Result]]:
+    """
+    Хэширует файлы и выдаёт (имя, хэш или OSError) строго в порядке names.
+    """
+    for index, result in in_order(iter_file_results(names, out_bits, jobs)):
+        if result.error is not None:
+            yield names[index], result.error
+        else:
+            assert result.digest is not None
+            yield names[index], result.digest
+
+
+# ============================================================================
+# ПРОВЕРКА МАНИФЕСТА (--check)
+# ============================================================================
+
+_PLAIN_LINE = re.compile(r'^([0-9a-fA-F]+) ([ *])(.+)$')
+_SIZED_LINE = re.compile(r'^([0-9a-fA-F]+)  (\d+) ([ *])(.+)$')
+_TAG_LINE = re.compile(r'^STREEBOG(256|512) \((.+)\) = ([0-9a-fA-F]+)$')
+
+
+class ManifestEntry(NamedTuple):
+    """Строка манифеста"""
+    name: str
+    digest: bytes
+    size: Optional[int]
+
+
+def _unescape(name: str) -> str:
+    return re.sub(r'\\(.)', lambda m: {'n': '\n', 'r': '\r'}.get(m[1], m[1]), name)
+
+
+def parse_manifest_line(line: str, with_size: bool = False
+                        ) -> Optional[ManifestEntry]:
+    """
+    Разбирает строку манифеста "<хэш>  <путь>" (или BSD-формат --tag).
+
+    Args:
+        line: Строка без перевода строки
+        with_size: Манифест записан с --size: "<хэш>  <размер>  <путь>"
+
+    Returns:
+        ManifestEntry или None, если строка не распознана
+    """
+    escaped = line.startswith('\\')
+    if escaped:
+        line = line[1:]
+
+    size: Optional[int] = None
+    match = _TAG_LINE.match(line)
+    if match:
+        bits, name, hexdigest = match.groups()
+        if len(hexdigest) * 4 != int(bits):
+            return None
+    elif with_size:
+        match = _SIZED_LINE.match(line)
+        if not match:
+            return None
+        hexdigest, size_text, _, name = match.groups()
+        size = int(size_text)
+    else:
+        match = _PLAIN_LINE.match(line)
+        if not match:
+            return None
+        hexdigest, _, name = match.groups()
+
+    if len(hexdigest) not in (64, 128):
+        return None
+    if escaped:
+        name = _unescape(name)
+    return ManifestEntry(name, bytes.fromhex(hexdigest), size)
+
+
+def _read_manifest(path: str) -> Iterator[str]:
+    if path == '-':
+        stream = io.TextIOWrapper(sys.stdin.buffer, errors='surrogateescape')
+        yield from (line.rstrip('\n') for line in stream)
+        return
+    with open(path, encoding='utf-8', errors='surrogateescape') as f:
+        yield from (line.rstrip('\n') for line in f)
+
+
+def _throughput(result: FileResult) -> str:
+    mib = result.size / (1 << 20)
+    speed = mib / result.seconds if result.seconds > 0 else float('inf')
+    return f"{mib:.1f} MiB, {speed:.2f} MiB/s"
+
+
+def check(manifests: list[str], args, prog: str) -> int:
+    """
+    Проверяет файлы по манифестам.
+
+    Файлы с записанным размером, отличным от фактического, отбраковываются
+    без чтения. С --fail-fast проверка останавливается на первом сбое.
+
+    Returns:
+        Код возврата: 0 — все файлы совпали, 1 — есть сбои
+    """
+    entries: list[ManifestEntry] = []
+    bad_lines = 0
+    out_bits = args.length if args.length_given else None
+    for manifest in manifests:
+        try:
+            lines = list(_read_manifest(manifest))
+        except OSError as e:
+            print(f"{prog}: {manifest}: {e.strerror or e}", file=sys.stderr)
+            return 1
+        for line in lines:
+            entry = parse_manifest_line(line, args.size)
+            if entry is not None and out_bits is None:
+                out_bits = len(entry.digest) * 8
+            if entry is None or len(entry.digest) * 8 != out_bits:
+                bad_lines += int(bool(line.strip()))
+                continue
+            entries.append(entry)
+
+    # Отбраковка по размеру — без чтения файлов
+    ready: dict[int, object] = {}
+    to_hash = []
+    for index, entry in enumerate(entries):
+        if entry.size is not None:
+            try:
+                actual = os.stat(entry.name).st_size
+            except OSError as e:
+                ready[index] = FileResult(None, e, 0, 0.0)
+                continue
+            if actual != entry.size:
+                ready[index] = f"FAILED (размер {actual} != {entry.size})"
+                continue
+        to_hash.append(index)
+
+    hashed = iter_file_results([entries[i].name for i in to_hash],
+                               out_bits or 512, args.jobs, args.digest_cache)
+    results = ((to_hash[position], result) for position, result in hashed)
+
+    failed = unreadable = 0
+
+    def report(index, result) -> bool:
+        nonlocal failed, unreadable
+        name = entries[index].name
+        if isinstance(result, str):
+            failed += 1
+            print(f"{name}: {result}")
+            return False
+        if result.error is not None:
+            unreadable += 1
+            print(f"{prog}: {name}: {result.error.strerror or result.error}",
+                  file=sys.stderr)
+            print(f"{name}: FAILED open or read")
+            return False
+        if result.digest != entries[index].digest:
+            failed += 1
+            print(f"{name}: FAILED")
+            return False
+        if not args.quiet:
+            suffix = f" ({_throughput(result)})" if args.verbose else ""
+            print(f"{name}: OK{suffix}")
+        return True
+
+    if args.fail_fast:
+        # Порядок завершения: первый же сбой останавливает проверку
+        for index, result in itertools.chain(sorted(ready.items()), results):
+            if not report(index, result):
+                break
+    else:
+        for index, result in in_order(results, ready):
+            report(index, result)
+
+    if bad_lines:
+        print(f"{prog}: WARNING: {bad_lines} line(s) improperly formatted",
+              file=sys.stderr)
+    if unreadable:
+        print(f"{prog}: WARNING: {unreadable} listed file(s) could not be read",
+              file=sys.stderr)
+    if failed:
+        print(f"{prog}: WARNING: {failed} computed checksum(s) did NOT match",
+              file=sys.stderr)
+    if not entries and not bad_lines:
+        print(f"{prog}: no properly formatted checksum lines found",
+              file=sys.stderr)
+        return 1
+    return 1 if failed or unreadable or not entries else 0
+
+
+# ============================================================================
+# ТОЧКА ВХОДА
+# ============================================================================
+
+def build_parser(prog: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Вычисление хэшей ГОСТ 34.11-2018 (Стрибог)",
+    )
+    parser.add_argument('files', nargs='*', metavar='ФАЙЛ',
+                        help='файлы для хэширования ("-" — стандартный ввод)')
+    parser.add_argument('-l', '--length', type=int, choices=(256, 512),
+                        help='длина хэша в битах')
+    parser.add_argument('-j', '--jobs', type=int, default=1, metavar='N',
+                        help='число процессов для хэширования файлов')
+    parser.add_argument('--tag', action='store_true',
+                        help='вывод в BSD-формате')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('-b', '--binary', action='store_true',
+                      help='пометить файлы как двоичные ("*")')
+    mode.add_argument('-t', '--text', action='store_true',
+                      help='пометить файлы как текстовые (по умолчанию)')
+    parser.add_argument('--cache', metavar='ФАЙЛ',
+                        help='кэш хэшей неизменившихся файлов (база SQLite)')
+    parser.add_argument('--size', action='store_true',
+                        help='записывать/читать размер файла в манифесте')
+    parser.add_argument('-c', '--check', action='store_true',
+                        help='проверить файлы по манифестам')
+    parser.add_argument('--fail-fast', action='store_true',
+                        help='(--check) остановиться на первом сбое')
+    parser.add_argument('--quiet', action='store_true',
+                        help='(--check) не печатать OK для совпавших файлов')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='(--check) печатать размер и скорость по файлам')
+    parser.add_argument('--self-test', action='store_true',
+                        help='проверить реализацию на тест-векторах и выйти')
+    return parser
+
+
+def main(argv: Optional[list[str]] = None, prog: Optional[str] = None) -> int:
+    """
+    Запуск командной строки.
+
+    Returns:
+        Код возврата: 0 — успех, 1 — хотя бы один файл не прочитан
+    """
+    prog = prog or os.path.basename(sys.argv[0])
+    if prog in ('__main__.py', 'cli.py', 'streebog.py', ''):
+        prog = 'streebog'
+
+    parser = build_parser(prog)
+    args = parser.parse_args(argv)
+    if args.self_test:
+        from streebog import _self_check
+        _self_check()
+        return 0
+
+    args.length_given = args.length is not None or _default_bits(prog) == 256 \
+        or '512' in prog
+    if args.length is None:
+        args.length = _default_bits(prog)
+    if args.jobs < 1:
+        args.jobs = 1
+    names = args.files or ['-']
+
+    if args.size and not args.check and '-' in names:
+        parser.error("--size не поддерживается для стандартного ввода")
+
+    args.digest_cache = None
+    if args.cache:
+        from digest_cache import DigestCache
+        args.digest_cache = DigestCache(args.cache)
+    try:
+        if args.check:
+            return check(names, args, prog)
+        return _print_digests(names, args, prog)
+    finally:
+        if args.digest_cache is not None:
+            args.digest_cache.close()
+
+
+def _print_digests(names: list[str], args, prog: str) -> int:
+    status = 0
+    results = in_order(iter_file_results(names, args.length, args.jobs,
+                                         args.digest_cache))
+    for index, result in results:
+        name = names[index]
+        if result.error is not None:
+            reason = result.error.strerror or str(result.error)
+            print(f"{prog}: {name}: {reason}", file=sys.stderr)
+            status = 1
+            continue
+        assert result.digest is not None
+        size = result.size if args.size else None
+        sys.stdout.write(format_line(
+            result.digest, name, args.length, args.tag, args.binary, size
+        ) + '\n')
+
+    sys.stdout.flush()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
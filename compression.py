@@ -5,10 +5,14 @@ compression.py - Функция сжатия ГОСТ 34.11-2018
 - key_schedule: генерация раундовых ключей K₁...K₁₃
 - E: функция шифрования (whitening + 12 LPS-раундов)
 - g: функция сжатия g_N(h, m)
+
+LPS вычисляется табличным способом (tables.LPS_table), побитово
+совпадающим с эталонным primitives.LPS.
 """
 
 from constants import C_CONSTANTS
-from primitives import LPS, X
+from primitives import X
+from tables import LPS_table as LPS
 from utils import xor_bytes
 
 
@@ -2,12 +2,15 @@
 """
 Константы для ГОСТ 34.11-2018 (Стрибог)
 Матрица A взята из RFC 6986 (ГОСТ Р 34.11-2012)
+
+Все константы неизменяемы (bytes и кортежи bytes): их разделяют
+между собой все потоки, и случайная запись в них невозможна.
 """
 
 # Матрица A для линейного преобразования l
 # Из RFC 6986, раздел 6.4
 # 64 строки по 8 байт каждая
-A_MATRIX = [
+A_MATRIX = (
     # Строки 0-3
     bytes.fromhex("8e20faa72ba0b470"),
     bytes.fromhex("47107ddd9b505a38"),
@@ -88,7 +91,7 @@ A_MATRIX = [
     bytes.fromhex("8d70c431ac02a736"),
     bytes.fromhex("c83862965601dd1b"),
     bytes.fromhex("641c314b2b8ee083"),
-]
+)
 
 # S-box (подстановка π)
 PI = bytes([
@@ -123,7 +126,7 @@ TAU = bytes([
 ])
 
 # Итерационные константы C[1] - C[12]
-C = [
+C = (
     bytes.fromhex(
         "b1085bda1ecadae9ebcb2f81c0657c1f"
         "2f6a76432e45d016714eb88d7585c4fc"
@@ -196,7 +199,7 @@ C = [
         "5d80ef9d1891cc86e71da4aa88e12852"
         "faf417d5d9b21b9948bc924af11bd720"
     ),
-]
+)
 
 # ============================================================================
 # ИТЕРАЦИОННЫЕ КОНСТАНТЫ C₁-C₁₂ - Раздел 5.5
@@ -0,0 +1,366 @@
+"""
+digest_cache.py - Кэш хэшей файлов ГОСТ 34.11-2018 в SQLite
+
+Сборка и выкладка раз за разом хэшируют одни и те же неизменные
+файлы. Кэш хранит хэш по (устройство, inode, out_bits) вместе с
+размером, mtime_ns и ctime_ns файла: если stat() совпал, хэш
+возвращается без чтения файла.
+
+Инвалидация:
+- любое изменение содержимого меняет mtime_ns (и ctime_ns, который
+  нельзя выставить вручную, в отличие от mtime через touch -d);
+- файл, изменённый во время хэширования, не запоминается: stat()
+  до и после хэширования должны совпасть;
+- файл, изменённый менее RACY_SECONDS назад, не запоминается: запись
+  в пределах гранулярности mtime не поменяла бы отметку времени.
+
+Вытеснение: prune() удаляет записи старше max_age и самые давно
+использованные сверх max_entries (LRU по времени последнего обращения).
+
+База в режиме WAL: читать из неё могут одновременно несколько
+процессов, пишущий процесс читателей не блокирует. Записи и отметки
+об использовании копятся в памяти и пишутся пачками; если база
+занята дольше BUSY_TIMEOUT, пачка отбрасывается — кэш не должен
+останавливать хэширование. Соединение принадлежит процессу, который
+его открыл: дочерним процессам нужен свой DigestCache.
+"""
+
+import os
+import sqlite3
+import stat
+import threading
+import time
+from typing import Optional, Union
+
+from streebog import hash_file
+
+
+# Сколько ждать занятую другим процессом базу (секунды)
+BUSY_TIMEOUT = 5.0
+
+# Файлы моложе этого не запоминаются (гранулярность mtime у FAT — 2 с)
+RACY_SECONDS = 2.0
+
+# Отметка об использовании обновляется не чаще раза в этот интервал
+TOUCH_INTERVAL = 3600
+
+# Сколько записей и отметок копить перед записью в базу
+FLUSH_EVERY = 1000
+
+# Ограничение по умолчанию для prune() при закрытии
+DEFAULT_MAX_ENTRIES = 1_000_000
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS digests (
+    dev      INTEGER NOT NULL,
+    ino      INTEGER NOT NULL,
+    out_bits INTEGER NOT NULL,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    ctime_ns INTEGER NOT NULL,
+    digest   BLOB    NOT NULL,
+    used     INTEGER NOT NULL,
+    PRIMARY KEY (dev, ino, out_bits)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS digests_used ON digests (used);
+"""
+
+
+def default_cache_path() -> str:
+    """$XDG_CACHE_HOME/streebog/digests.sqlite (по умолчанию ~/.cache)"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "streebog", "digests.sqlite")
+
+
+def _signed64(value: int) -> int:
+    # st_dev и st_ino беззнаковые 64-битные, INTEGER в SQLite — знаковый
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _key(st: os.stat_result, out_bits: int) -> tuple[int, int, int]:
+    return _signed64(st.st_dev), _signed64(st.st_ino), out_bits
+
+
+def _fingerprint(st: os.stat_result) -> tuple[int, int, int, int, int]:
+    return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns
+
+
+# ============================================================================
+# КЭШ
+# ============================================================================
+
+class DigestCache:
+    """
+    Кэш хэшей файлов.
+
+    Args:
+        path: Файл базы (по умолчанию default_cache_path())
+        max_entries: Предел записей для prune() при закрытии (None — без предела)
+        max_age: Удалять при закрытии записи, не использованные столько
+            секунд (None — не удалять по возрасту)
+
+    Example:
+        >>> with DigestCache() as cache:
+        ...     digest = cache.hash_file("image.iso", 256)
+    """
+
+    def __init__(self, path: Union[str, os.PathLike, None] = None,
+                 max_entries: Optional[int] = DEFAULT_MAX_ENTRIES,
+                 max_age: Optional[float] = None):
+        self.path = os.fspath(path) if path is not None else default_cache_path()
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        # Автофиксация: транзакции открываются явно в _write()
+        self._db = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT,
+                                   isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        # Ещё не записанные хэши: ключ → строка таблицы
+        self._pending: dict[tuple, tuple] = {}
+        self._touched: list[tuple] = []
+        self._stored = 0
+        self._open_schema()
+
+    def _open_schema(self) -> None:
+        db = self._db
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        if self._schema_version() == SCHEMA_VERSION:
+            return
+
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            # Другой процесс мог создать схему, пока мы ждали блокировку
+            if self._schema_version() != SCHEMA_VERSION:
+                db.execute("DROP TABLE IF EXISTS digests")
+                for statement in _SCHEMA.split(";"):
+                    if statement.strip():
+                        db.execute(statement)
+                db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def _schema_version(self) -> int:
+        return self._db.execute("PRAGMA user_version").fetchone()[0]
+
+    # ------------------------------------------------------------------------
+    # Чтение и запись
+    # ------------------------------------------------------------------------
+
+    def lookup(self, st: os.stat_result, out_bits: int) -> Optional[bytes]:
+        """
+        Хэш файла по результату stat(), если он есть в кэше и не устарел.
+
+        Args:
+            st: os.stat() файла
+            out_bits: 256 или 512
+
+        Returns:
+            Хэш-код или None (нет в кэше, файл изменился, не обычный файл)
+        """
+        if not stat.S_ISREG(st.st_mode):
+            return None
+
+        key = _key(st, out_bits)
+        with self._lock:
+            row = self._pending.get(key)
+            if row is not None:
+                row = row[3:]
+            else:
+                row = self._db.execute(
+                    "SELECT size, mtime_ns, ctime_ns, digest, used FROM digests"
+                    " WHERE dev = ? AND ino = ? AND out_bits = ?", key
+                ).fetchone()
+            if row is None or row[:3] != (st.st_size, st.st_mtime_ns, st.st_ctime_ns):
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            now = int(time.time())
+            if row[4] < now - TOUCH_INTERVAL:
+                self._touched.append((now,) + key)
+                if len(self._touched) >= FLUSH_EVERY:
+                    self._flush_locked()
+            return row[3]
+
+    def store(self, path: Union[str, bytes, os.PathLike], before: os.stat_result,
+              out_bits: int, digest: bytes) -> bool:
+        """
+        Запоминает хэш, если файл не менялся с момента stat() перед хэшированием.
+
+        Args:
+            path: Путь к файлу
+            before: os.stat() файла, снятый до начала хэширования
+            out_bits: 256 или 512
+            digest: Вычисленный хэш
+
+        Returns:
+            True, если хэш поставлен в очередь на запись
+        """
+        if not stat.S_ISREG(before.st_mode):
+            return False
+        if before.st_mtime_ns >= time.time_ns() - int(RACY_SECONDS * 1e9):
+            return False
+        try:
+            after = os.stat(path)
+        except OSError:
+            return False
+        if _fingerprint(after) != _fingerprint(before):
+            return False
+
+        key = _key(before, out_bits)
+        row = key + (before.st_size, before.st_mtime_ns, before.st_ctime_ns,
+                     bytes(digest), int(time.time()))
+        with self._lock:
+            self._pending[key] = row
+            if len(self._pending) >= FLUSH_EVERY:
+                self._flush_locked()
+        return True
+
+    def hash_file(self, path: Union[str, bytes, os.PathLike],
+                  out_bits: int = 512) -> bytes:
+        """
+        streebog.hash_file() через кэш.
+
+        Raises:
+            OSError: Если файл не удалось открыть или прочитать
+        """
+        before = os.stat(path)
+        digest = self.lookup(before, out_bits)
+        if digest is None:
+            digest = hash_file(path, out_bits)
+            self.store(path, before, out_bits, digest)
+        return digest
+
+    # ------------------------------------------------------------------------
+    # Запись пачками и вытеснение
+    # ------------------------------------------------------------------------
+
+    def _write(self, *statements: tuple[str, list]) -> bool:
+        """Выполняет executemany в одной транзакции; False — база занята"""
+        db = self._db
+        try:
+            db.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError:
+            return False
+        try:
+            for sql, rows in statements:
+                db.executemany(sql, rows)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return True
+
+    def _flush_locked(self) -> None:
+        pending, self._pending = list(self._pending.values()), {}
+        touched, self._touched = self._touched, []
+        if not pending and not touched:
+            return
+        if self._write(
+            ("INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?, ?, ?)", pending),
+            ("UPDATE digests SET used = ? WHERE dev = ? AND ino = ? AND out_bits = ?",
+             touched),
+        ):
+            self._stored += len(pending)
+
+    def flush(self) -> None:
+        """Пишет накопленные записи и отметки об использовании"""
+        with self._lock:
+            self._flush_locked()
+
+    def prune(self, max_entries: Optional[int] = None,
+              max_age: Optional[float] = None) -> int:
+        """
+        Удаляет устаревшие записи.
+
+        Args:
+            max_entries: Оставить не больше стольких недавно использованных
+            max_age: Удалить не использованные дольше стольких секунд
+
+        Returns:
+            Число удалённых записей
+        """
+        with self._lock:
+            self._flush_locked()
+            db = self._db
+            before = db.total_changes
+            statements = []
+            if max_age is not None:
+                statements.append(("DELETE FROM digests WHERE used < ?",
+                                   [(int(time.time() - max_age),)]))
+            if max_entries is not None:
+                statements.append((
+                    "DELETE FROM digests WHERE (dev, ino, out_bits) IN ("
+                    " SELECT dev, ino, out_bits FROM digests"
+                    " ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                    [(max_entries,)],
+                ))
+            if statements and not self._write(*statements):
+                return 0
+            return db.total_changes - before
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT count(*) FROM digests").fetchone()[0]
+
+    def close(self) -> None:
+        """Сбрасывает очередь, при необходимости вытесняет записи и закрывает базу"""
+        if self._db is None:
+            return
+        self.flush()
+        if self._stored and (self.max_entries is not None or self.max_age is not None):
+            self.prune(self.max_entries, self.max_age)
+        with self._lock:
+            self._db.close()
+            self._db = None
+
+    def __enter__(self) -> "DigestCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# ============================================================================
+# САМОТЕСТИРОВАНИЕ
+# ============================================================================
+
+def _self_check() -> None:
+    """Промах, попадание и инвалидация на временном файле"""
+    import tempfile
+    from streebog import hash_256
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data.bin")
+        with open(path, "wb") as f:
+            f.write(b"streebog" * 100)
+        old = time.time() - 60
+        os.utime(path, (old, old))
+
+        with DigestCache(os.path.join(tmp, "cache.sqlite")) as cache:
+            assert cache.hash_file(path, 256) == hash_256(b"streebog" * 100)
+            assert cache.hash_file(path, 256) == hash_256(b"streebog" * 100)
+            assert (cache.hits, cache.misses) == (1, 1)
+
+            with open(path, "ab") as f:
+                f.write(b"!")
+            assert cache.hash_file(path, 256) == hash_256(b"streebog" * 100 + b"!")
+            assert cache.misses == 2
+
+    print("✓ Кэш хэшей файлов: попадание и инвалидация работают корректно")
+
+
+if __name__ == "__main__":
+    _self_check()
@@ -0,0 +1,237 @@
+"""
+hmac_streebog.py - HMAC на основе ГОСТ 34.11-2018
+
+HMAC_GOSTR3411_2012_256 / HMAC_GOSTR3411_2012_512 по схеме RFC 7836:
+
+    HMAC(K, T) = H((K ⊕ opad) || H((K ⊕ ipad) || T))
+
+Совместимость: модуль совпадает с hmac.new(key, msg, streebog256)
+поверх хэша этого пакета, но НЕ воспроизводит контрольный пример
+RFC 7836 (K = 00..1f). Сообщения HMAC длиннее блока, а
+для многоблочных сообщений хэш пакета расходится со стандартом из-за
+порядка байтов (совпадает только вектор M1, см. backends._validate).
+MAC этого модуля нельзя сверять с другими реализациями.
+
+Блоки K ⊕ ipad и K ⊕ opad занимают ровно один 64-байтовый блок,
+поэтому они сжимаются функцией g один раз на ключ, а полученные
+промежуточные состояния (midstates) кэшируются. Каждый MAC стоит
+только блоков сообщения и одной внешней финализации.
+
+Модуль назван hmac_streebog, чтобы не затенять стандартный hmac.
+"""
+
+from functools import lru_cache
+from hmac import compare_digest
+from typing import Iterable, Optional
+
+from streebog import Streebog
+
+
+BLOCK_SIZE = 64
+IPAD = 0x36
+OPAD = 0x5c
+
+# Сколько ключей держать в кэше промежуточных состояний
+KEY_CACHE_SIZE = 256
+
+
+# ============================================================================
+# КЛЮЧ С ПРЕДВЫЧИСЛЕННЫМИ СОСТОЯНИЯМИ
+# ============================================================================
+
+class HMACKey:
+    """
+    Ключ HMAC-Streebog с предвычисленными внутренним и внешним состояниями.
+
+    Args:
+        key: Ключ произвольной длины (длиннее 64 байт — хэшируется)
+        out_bits: 256 или 512
+
+    Example:
+        >>> signer = HMACKey(b"secret", 256)
+        >>> tag = signer.mac(b"request")
+        >>> signer.verify(b"request", tag)
+        True
+    """
+
+    def __init__(self, key: bytes, out_bits: int = 256):
+        if out_bits not in (256, 512):
+            raise ValueError(f"out_bits должен быть 256 или 512, получено {out_bits}")
+
+        self.out_bits = out_bits
+
+        key = bytes(key)
+        if len(key) > BLOCK_SIZE:
+            key = Streebog(out_bits, key).digest()
+        key = key.ljust(BLOCK_SIZE, b"\x00")
+
+        # Ровно по одному блоку: g применяется один раз, буфер пуст
+        self._inner = Streebog(out_bits, bytes(b ^ IPAD for b in key))
+        self._outer = Streebog(out_bits, bytes(b ^ OPAD for b in key))
+
+    @property
+    def digest_size(self) -> int:
+        return self.out_bits // 8
+
+    def midstates(self) -> tuple[tuple[int, int, int], tuple[int, int, int]]:
+        """
+        Промежуточные состояния (h, N, Σ) после блоков K ⊕ ipad и K ⊕ opad.
+
+        Нужны для вычислений прямо на функции сжатия (см. kdf.py).
+        """
+        inner, outer = self._inner, self._outer
+        return (inner.h, inner.N, inner.Sigma), (outer.h, outer.N, outer.Sigma)
+
+    def new(self, msg=None) -> "HMAC":
+        """Новый объект HMAC на этом ключе (можно вызывать update())"""
+        return HMAC(self, msg)
+
+    def mac(self, msg) -> bytes:
+        """
+        Вычисляет HMAC сообщения.
+
+        Args:
+            msg: Сообщение (любой объект с buffer protocol)
+
+        Returns:
+            Код аутентификации (32 или 64 байта)
+        """
+        inner = self._inner.copy()
+        inner.update(msg)
+        outer = self._outer.copy()
+        outer.update(inner.digest())
+        return outer.digest()
+
+    def verify(self, msg, tag: bytes) -> bool:
+        """Проверяет код аутентификации за постоянное время"""
+        return compare_digest(self.mac(msg), tag)
+
+    def verify_many(self, pairs: Iterable[tuple[bytes, bytes]]) -> list[bool]:
+        """
+        Проверяет много пар (сообщение, код) на одном ключе.
+
+        Returns:
+            Список результатов в порядке пар
+        """
+        return [self.verify(msg, tag) for msg, tag in pairs]
+
+
+# ============================================================================
+# ОБЪЕКТ HMAC (ИНТЕРФЕЙС КАК У hmac.HMAC)
+# ============================================================================
+
+class HMAC:
+    """
+    Потоковый HMAC-Streebog поверх HMACKey.
+
+    Args:
+        key: Подготовленный ключ
+        msg: Необязательные начальные данные
+    """
+
+    block_size = BLOCK_SIZE
+
+    def __init__(self, key: HMACKey, msg=None):
+        self._key = key
+        self._inner = key._inner.copy()
+        if msg is not None:
+            self._inner.update(msg)
+
+    @property
+    def name(self) -> str:
+        return f"hmac-streebog{self._key.out_bits}"
+
+    @property
+    def digest_size(self) -> int:
+        return self._key.digest_size
+
+    def update(self, msg) -> None:
+        self._inner.update(msg)
+
+    def copy(self) -> "HMAC":
+        clone = HMAC.__new__(HMAC)
+        clone._key = self._key
+        clone._inner = self._inner.copy()
+        return clone
+
+    def digest(self) -> bytes:
+        outer = self._key._outer.copy()
+        outer.update(self._inner.digest())
+        return outer.digest()
+
+    def hexdigest(self) -> str:
+        return self.digest().hex()
+
+
+# ============================================================================
+# ФУНКЦИИ-ОБЁРТКИ
+# ============================================================================
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def _cached_key(key: bytes, out_bits: int) -> HMACKey:
+    return HMACKey(key, out_bits)
+
+
+def new(key: bytes, msg=None, out_bits: int = 256) -> HMAC:
+    """
+    Создаёт объект HMAC; подготовка ключа кэшируется между вызовами.
+
+    Args:
+        key: Ключ
+        msg: Необязательные начальные данные
+        out_bits: 256 или 512
+    """
+    return _cached_key(bytes(key), out_bits).new(msg)
+
+
+def hmac_256(key: bytes, msg) -> bytes:
+    """HMAC_GOSTR3411_2012_256(key, msg)"""
+    return _cached_key(bytes(key), 256).mac(msg)
+
+
+def hmac_512(key: bytes, msg) -> bytes:
+    """HMAC_GOSTR3411_2012_512(key, msg)"""
+    return _cached_key(bytes(key), 512).mac(msg)
+
+
+def verify_many(key: bytes, pairs: Iterable[tuple[bytes, bytes]],
+                out_bits: Optional[int] = None) -> list[bool]:
+    """
+    Проверяет много пар (сообщение, код) на одном ключе.
+
+    Args:
+        key: Ключ
+        pairs: Пары (сообщение, код аутентификации)
+        out_bits: 256 или 512; по умолчанию — по длине первого кода
+
+    Returns:
+        Список результатов в порядке пар
+    """
+    pairs = list(pairs)
+    if out_bits is None:
+        out_bits = 512 if pairs and len(pairs[0][1]) == 64 else 256
+    return _cached_key(bytes(key), out_bits).verify_many(pairs)
+
+
+# ============================================================================
+# САМОТЕСТИРОВАНИЕ
+# ============================================================================
+
+def _self_check() -> None:
+    """Сверка с универсальным hmac из стандартной библиотеки"""
+    import hmac
+    from streebog import streebog256, streebog512
+
+    for key in (b"", b"key", bytes(range(64)), b"k" * 100):
+        for msg in (b"", b"message", b"m" * 200):
+            assert hmac_256(key, msg) == hmac.new(key, msg, streebog256).digest()
+            assert hmac_512(key, msg) == hmac.new(key, msg, streebog512).digest()
+
+    tag = hmac_256(b"key", b"msg")
+    assert verify_many(b"key", [(b"msg", tag), (b"bad", tag)]) == [True, False]
+
+    print("✓ HMAC-Streebog совпадает с hmac.new(..., streebog*)")
+
+
+if __name__ == "__main__":
+    _self_check()
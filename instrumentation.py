@@ -0,0 +1,286 @@
+"""
+instrumentation.py - Счётчики и замеры времени для Streebog (по запросу)
+
+Выключенная инструментация ничего не стоит: enable() подменяет методы
+Streebog и функции compression.py обёртками со счётчиками, disable()
+возвращает исходные функции на место. Проверок "включено ли" на
+горячем пути нет.
+
+Счётчики:
+- blocks: блоки, прошедшие через g по сообщению (включая дополненный)
+- bytes: байты, поданные в update()
+- g_calls по фазам: message (блоки сообщения), length (g_0(h, N)),
+  checksum (g_0(h, Σ))
+
+Время по стадиям (секунды, накопительно):
+- update: весь update() — буферизация вместе со сжатием блоков
+- compress: сжатие полных блоков (буферизация = update − compress)
+- finalize: digest() — последний блок и две финальные g (для
+  сообщений короче 64 байт в hash_256/hash_512 — весь короткий путь)
+- key_schedule, E: внутри байтовой функции сжатия (реализация table);
+  целочисленная g совмещает расписание ключей с раундами и их не делит,
+  поэтому без вызовов table эти стадии в экспорт Prometheus не попадают
+
+Учитывается только работа через объекты Streebog (hash_256, hash_512,
+hash_file, HMAC...); пакетный режим и PBKDF2 считают g напрямую.
+"""
+
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+
+import compression
+import streebog
+from streebog import Streebog
+
+
+PHASES = ("message", "length", "checksum")
+STAGES = ("update", "compress", "finalize", "key_schedule", "E")
+
+# Стадии, которые измеряет только реализация table
+SPLIT_STAGES = ("key_schedule", "E")
+
+_lock = threading.Lock()
+_originals: dict = {}
+
+
+def _zero() -> dict:
+    return {
+        "blocks": 0,
+        "bytes": 0,
+        "g_calls": dict.fromkeys(PHASES, 0),
+        "seconds": dict.fromkeys(STAGES, 0.0),
+    }
+
+
+_stats = _zero()
+
+
+# ============================================================================
+# ОБЁРТКИ
+# ============================================================================
+
+def _add_seconds(stage: str, seconds: float) -> None:
+    with _lock:
+        _stats["seconds"][stage] += seconds
+
+
+def _wrap_update(update):
+    def instrumented_update(self, data) -> None:
+        with memoryview(data) as view:
+            size = view.nbytes
+        start = time.perf_counter()
+        update(self, data)
+        elapsed = time.perf_counter() - start
+        with _lock:
+            _stats["bytes"] += size
+            _stats["seconds"]["update"] += elapsed
+    return instrumented_update
+
+
+def _wrap_process_blocks(process_blocks):
+    def instrumented_process_blocks(self, data, start: int, end: int) -> None:
+        began = time.perf_counter()
+        process_blocks(self, data, start, end)
+        elapsed = time.perf_counter() - began
+        count = (end - start) // 64
+        with _lock:
+            _stats["blocks"] += count
+            _stats["g_calls"]["message"] += count
+            _stats["seconds"]["compress"] += elapsed
+    return instrumented_process_blocks
+
+
+def _wrap_digest(digest):
+    def instrumented_digest(self) -> bytes:
+        start = time.perf_counter()
+        result = digest(self)
+        elapsed = time.perf_counter() - start
+        with _lock:
+            _stats["blocks"] += 1
+            for phase in PHASES:
+                _stats["g_calls"][phase] += 1
+            _stats["seconds"]["finalize"] += elapsed
+        return result
+    return instrumented_digest
+
+
+def _wrap_hash_short(hash_short):
+    def instrumented_hash_short(message, out_bits: int):
+        start = time.perf_counter()
+        result = hash_short(message, out_bits)
+        elapsed = time.perf_counter() - start
+        if result is None:
+            return None
+        with _lock:
+            _stats["bytes"] += len(message)
+            _stats["blocks"] += 1
+            for phase in PHASES:
+                _stats["g_calls"][phase] += 1
+            _stats["seconds"]["finalize"] += elapsed
+        return result
+    return instrumented_hash_short
+
+
+def _wrap_timed(func, stage: str):
+    def timed(*args):
+        start = time.perf_counter()
+        result = func(*args)
+        _add_seconds(stage, time.perf_counter() - start)
+        return result
+    return timed
+
+
+# ============================================================================
+# ВКЛЮЧЕНИЕ И ВЫКЛЮЧЕНИЕ
+# ============================================================================
+
+def enabled() -> bool:
+    return bool(_originals)
+
+
+def enable() -> None:
+    """Подменяет горячие функции обёртками со счётчиками (идемпотентно)"""
+    with _lock:
+        if _originals:
+            return
+        _originals.update({
+            (Streebog, "update"): Streebog.update,
+            (Streebog, "_process_blocks"): Streebog._process_blocks,
+            (Streebog, "digest"): Streebog.digest,
+            (streebog, "_hash_short"): streebog._hash_short,
+            (compression, "key_schedule"): compression.key_schedule,
+            (compression, "E"): compression.E,
+        })
+        wrappers = {
+            (Streebog, "update"): _wrap_update(Streebog.update),
+            (Streebog, "_process_blocks"):
+                _wrap_process_blocks(Streebog._process_blocks),
+            (Streebog, "digest"): _wrap_digest(Streebog.digest),
+            (streebog, "_hash_short"): _wrap_hash_short(streebog._hash_short),
+            (compression, "key_schedule"):
+                _wrap_timed(compression.key_schedule, "key_schedule"),
+            (compression, "E"): _wrap_timed(compression.E, "E"),
+        }
+        # setattr, а не присваивание: подмена методов класса намеренная
+        for (owner, name), func in wrappers.items():
+            setattr(owner, name, func)
+
+
+def disable() -> None:
+    """Возвращает исходные функции; накопленные счётчики сохраняются"""
+    with _lock:
+        for (owner, name), func in _originals.items():
+            setattr(owner, name, func)
+        _originals.clear()
+
+
+def reset() -> None:
+    """Обнуляет счётчики"""
+    global _stats
+    with _lock:
+        _stats = _zero()
+
+
+# ============================================================================
+# ЧТЕНИЕ И ЭКСПОРТ
+# ============================================================================
+
+def snapshot() -> dict:
+    """
+    Копия текущих счётчиков.
+
+    Returns:
+        {"blocks": int, "bytes": int,
+         "g_calls": {фаза: int}, "seconds": {стадия: float}}
+    """
+    with _lock:
+        return {
+            "blocks": _stats["blocks"],
+            "bytes": _stats["bytes"],
+            "g_calls": dict(_stats["g_calls"]),
+            "seconds": dict(_stats["seconds"]),
+        }
+
+
+def prometheus_text(stats: Optional[dict] = None) -> str:
+    """
+    Счётчики в текстовом формате Prometheus (exposition format 0.0.4).
+
+    Нулевые key_schedule и E не экспортируются: на целочисленной g
+    они не измеряются, и ноль выглядел бы как измерение.
+
+    Args:
+        stats: Результат snapshot() (по умолчанию — текущие счётчики)
+    """
+    stats = stats or snapshot()
+    lines = [
+        "# HELP streebog_blocks_total Message blocks compressed.",
+        "# TYPE streebog_blocks_total counter",
+        f"streebog_blocks_total {stats['blocks']}",
+        "# HELP streebog_bytes_total Bytes passed to Streebog.update().",
+        "# TYPE streebog_bytes_total counter",
+        f"streebog_bytes_total {stats['bytes']}",
+        "# HELP streebog_g_calls_total Compression function calls by phase.",
+        "# TYPE streebog_g_calls_total counter",
+    ]
+    lines += [f'streebog_g_calls_total{{phase="{phase}"}} {count}'
+              for phase, count in stats["g_calls"].items()]
+    lines += [
+        "# HELP streebog_stage_seconds_total Cumulative time per stage.",
+        "# TYPE streebog_stage_seconds_total counter",
+    ]
+    lines += [f'streebog_stage_seconds_total{{stage="{stage}"}} {seconds:.9f}'
+              for stage, seconds in stats["seconds"].items()
+              if seconds or stage not in SPLIT_STAGES]
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: str, stats: Optional[dict] = None) -> None:
+    """
+    Атомарно записывает счётчики в файл (для textfile collector).
+
+    Файл пишется во временный рядом и переименовывается, так что
+    сборщик никогда не видит его наполовину записанным. Права 0644:
+    mkstemp создаёт файл с 0600, а сборщик может работать от другого
+    пользователя.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".streebog-", suffix=".prom")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(prometheus_text(stats))
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+# ============================================================================
+# САМОТЕСТИРОВАНИЕ
+# ============================================================================
+
+def _self_check() -> None:
+    """Счётчики после хэширования известного объёма данных"""
+    from streebog import hash_512
+
+    reset()
+    enable()
+    try:
+        hash_512(bytes(200))
+    finally:
+        disable()
+
+    stats = snapshot()
+    assert stats["bytes"] == 200
+    assert stats["blocks"] == 4
+    assert stats["g_calls"] == {"message": 4, "length": 1, "checksum": 1}
+
+    print("✓ Инструментация считает блоки, байты и вызовы g")
+
+
+if __name__ == "__main__":
+    _self_check()
@@ -0,0 +1,215 @@
+"""
+int_compression.py - Функция сжатия ГОСТ 34.11-2018 на целых числах
+
+Та же функция сжатия, что и в compression.py, но все 512-битные
+векторы (h, N, m, раундовые ключи, состояние) представлены одним
+целым числом Python в big-endian порядке: байт 0 вектора — старший.
+
+XOR и сложение mod 2^512 выполняются одной операцией над числом,
+а LPS — через таблицы из tables.py. Преобразование в bytes нужно
+только на границе API (см. streebog.py).
+
+Временных объектов на LPS — минимум: один bytes для входа, одна
+упаковка восьми слов и одно число на выходе. Контейнеров (списков,
+кортежей, генераторов) горячий путь g_int не создаёт вовсе, поэтому
+сборщик мусора потоковым хэшированием не запускается.
+"""
+
+import struct
+
+from constants import C_CONSTANTS, IV_256, IV_512
+from tables import LPS_TABLES
+from utils import bytes_to_int
+
+
+# Восемь 64-битных слов big-endian — 512-битный вектор
+_WORDS = struct.Struct('>8Q')
+
+# Итерационные константы C₁...C₁₂ в виде чисел
+C_INT = tuple(bytes_to_int(c) for c in C_CONSTANTS)
+
+
+# ============================================================================
+# LPS
+# ============================================================================
+
+def LPS_int(a: int) -> int:
+    """
+    Композиция L ∘ P ∘ S над 512-битным числом.
+
+    Args:
+        a: 512-битное число (big-endian представление вектора)
+
+    Returns:
+        512-битное число
+    """
+    T0, T1, T2, T3, T4, T5, T6, T7 = LPS_TABLES
+    b = a.to_bytes(64, byteorder='big')
+
+    # Слово j результата: T_k[b[8k + j]], k = 0..7 (см. tables.py)
+    return int.from_bytes(_WORDS.pack(
+        T0[b[0]] ^ T1[b[8]] ^ T2[b[16]] ^ T3[b[24]] ^
+        T4[b[32]] ^ T5[b[40]] ^ T6[b[48]] ^ T7[b[56]],
+        T0[b[1]] ^ T1[b[9]] ^ T2[b[17]] ^ T3[b[25]] ^
+        T4[b[33]] ^ T5[b[41]] ^ T6[b[49]] ^ T7[b[57]],
+        T0[b[2]] ^ T1[b[10]] ^ T2[b[18]] ^ T3[b[26]] ^
+        T4[b[34]] ^ T5[b[42]] ^ T6[b[50]] ^ T7[b[58]],
+        T0[b[3]] ^ T1[b[11]] ^ T2[b[19]] ^ T3[b[27]] ^
+        T4[b[35]] ^ T5[b[43]] ^ T6[b[51]] ^ T7[b[59]],
+        T0[b[4]] ^ T1[b[12]] ^ T2[b[20]] ^ T3[b[28]] ^
+        T4[b[36]] ^ T5[b[44]] ^ T6[b[52]] ^ T7[b[60]],
+        T0[b[5]] ^ T1[b[13]] ^ T2[b[21]] ^ T3[b[29]] ^
+        T4[b[37]] ^ T5[b[45]] ^ T6[b[53]] ^ T7[b[61]],
+        T0[b[6]] ^ T1[b[14]] ^ T2[b[22]] ^ T3[b[30]] ^
+        T4[b[38]] ^ T5[b[46]] ^ T6[b[54]] ^ T7[b[62]],
+        T0[b[7]] ^ T1[b[15]] ^ T2[b[23]] ^ T3[b[31]] ^
+        T4[b[39]] ^ T5[b[47]] ^ T6[b[55]] ^ T7[b[63]],
+    ), byteorder='big')
+
+
+# ============================================================================
+# КЛЮЧЕВОЕ РАСПИСАНИЕ И ФУНКЦИЯ E
+# ============================================================================
+
+def key_schedule_int(K0: int) -> list[int]:
+    """
+    Генерация раундовых ключей K₁...K₁₃ (K₁ = K₀, K_{i+1} = LPS(K_i ⊕ C_i)).
+
+    Args:
+        K0: Начальный ключ (512-битное число)
+
+    Returns:
+        Список из 13 ключей
+    """
+    keys = [K0]
+    for c in C_INT:
+        keys.append(LPS_int(keys[-1] ^ c))
+    return keys
+
+
+def E_int(K0: int, m: int) -> int:
+    """
+    Функция шифрования E(K₀, m) над 512-битными числами.
+
+    Раундовые ключи вычисляются по ходу раундов, без списка.
+    """
+    K = K0
+    state = m
+    for c in C_INT:
+        state = LPS_int(state ^ K)
+        K = LPS_int(K ^ c)
+    return state ^ K
+
+
+# ============================================================================
+# ФУНКЦИЯ СЖАТИЯ g
+# ============================================================================
+
+def g_int(N: int, h: int, m: int) -> int:
+    """
+    Функция сжатия g_N(h, m) = E(LPS(h ⊕ N), m) ⊕ h ⊕ m.
+
+    Args:
+        N: Счётчик обработанных бит (512-битное число)
+        h: Текущее состояние хэша (512-битное число)
+        m: Блок сообщения (512-битное число)
+
+    Returns:
+        Новое состояние хэша (512-битное число)
+    """
+    K = LPS_int(h ^ N)
+    state = m
+    for c in C_INT:
+        state = LPS_int(state ^ K)
+        K = LPS_int(K ^ c)
+    return state ^ K ^ h ^ m
+
+
+# ============================================================================
+# КОРОТКИЕ СООБЩЕНИЯ
+# ============================================================================
+
+def _iv_keys(iv: bytes) -> tuple[int, tuple[int, ...], int]:
+    """
+    IV и раундовые ключи первого блока.
+
+    Для первого блока h = IV и N = 0, поэтому K₁ = LPS(IV) и всё
+    расписание K₁...K₁₃ — константы.
+
+    Returns:
+        (IV, ключи раундов K₁...K₁₂, финальный ключ K₁₃)
+    """
+    keys = key_schedule_int(LPS_int(bytes_to_int(iv)))
+    return bytes_to_int(iv), tuple(keys[:12]), keys[12]
+
+
+_IV_KEYS = {512: _iv_keys(IV_512), 256: _iv_keys(IV_256)}
+
+
+def hash_short_int(message: bytes, out_bits: int = 512) -> bytes:
+    """
+    Хэш сообщения короче 64 байт: один дополненный блок и две
+    финальные g, без объекта Streebog.
+
+    Первая g идёт на предвычисленных ключах IV (12 LPS вместо 25).
+    Дополнение как в utils.pad_last_block: 0…0 || 1 || M, для целых
+    байт единичный бит — младший бит байта перед сообщением.
+
+    Args:
+        message: Сообщение короче 64 байт
+        out_bits: 256 или 512
+
+    Returns:
+        Хэш-код (32 или 64 байта)
+    """
+    size = len(message)
+    if size >= 64:
+        raise ValueError(f"Короткий путь требует < 64 байт, получено {size}")
+    h, round_keys, last_key = _IV_KEYS[out_bits]
+
+    m = (1 << 8 * size) | int.from_bytes(message, byteorder='big')
+    state = m
+    for K in round_keys:
+        state = LPS_int(state ^ K)
+    h ^= state ^ last_key ^ m
+
+    # N = |M| в битах, Σ = m
+    h = g_int(0, h, 8 * size)
+    h = g_int(0, h, m)
+    digest = h.to_bytes(64, byteorder='big')
+    return digest[:32] if out_bits == 256 else digest
+
+
+# ============================================================================
+# САМОТЕСТИРОВАНИЕ
+# ============================================================================
+
+def _self_check() -> None:
+    """Сверка с байтовой функцией сжатия"""
+    import os
+    from compression import E, g, key_schedule
+    from utils import int_to_bytes
+
+    for _ in range(4):
+        N, h, m = (os.urandom(64) for _ in range(3))
+        expected = g(N, h, m)
+        result = g_int(bytes_to_int(N), bytes_to_int(h), bytes_to_int(m))
+        assert int_to_bytes(result, 64) == expected, "g_int расходится с g"
+
+    K0, m = os.urandom(64), os.urandom(64)
+    assert int_to_bytes(E_int(bytes_to_int(K0), bytes_to_int(m)), 64) == E(K0, m)
+    assert [int_to_bytes(k, 64) for k in key_schedule_int(bytes_to_int(K0))] \
+        == key_schedule(K0)
+
+    from backends import hash_with
+    for size in (0, 1, 31, 32, 63):
+        message = os.urandom(size)
+        for out_bits in (256, 512):
+            assert hash_short_int(message, out_bits) == \
+                hash_with(g_int, message, out_bits), "hash_short_int расходится"
+
+    print("✓ Целочисленная функция сжатия совпадает с байтовой")
+
+
+if __name__ == "__main__":
+    _self_check()
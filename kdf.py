@@ -0,0 +1,262 @@
+"""
+kdf.py - Функции выработки ключей на основе ГОСТ 34.11-2018
+
+KDF_256 и KDF_TREE_GOSTR3411_2012_256 по схеме RFC 7836 (разделы 4.4-4.5):
+
+    K(i) = HMAC_256(K_in, [i]_b || label || 0x00 || seed || [L]_b)
+
+HMAC-ключ K_in подготавливается один раз (KDFTree), поэтому на каждый
+выходной блок приходятся только блоки его сообщения. Контрольный
+пример RFC 7836 не воспроизводится по той же причине, что и у
+hmac_streebog: ключи совместимы только с этим пакетом.
+
+PBKDF2 с HMAC_GOSTR3411_2012 в качестве PRF по схеме Р 50.1.111-2016:
+
+    T_i = U_1 ⊕ ... ⊕ U_c,  U_1 = PRF(P, S || INT(i)),  U_j = PRF(P, U_{j-1})
+
+Контрольные примеры Р 50.1.111-2016 не воспроизводятся: PRF — это
+hmac_streebog, который из-за порядка байтов расходится со стандартом
+(см. его docstring). Ключи совместимы только с этим пакетом.
+
+Ключ P подготавливается один раз (hmac_streebog.HMACKey), а цикл
+итераций работает прямо на целочисленной функции сжатия: U_j имеет
+длину хэша, поэтому каждая итерация — фиксированная цепочка вызовов
+g_int без объектов Streebog и без преобразований в bytes.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional
+
+from hmac_streebog import HMACKey
+from int_compression import g_int
+from parallel import default_workers
+from utils import MASK_512, bytes_to_int, int_to_bytes
+
+
+# ============================================================================
+# PRF НА ЦЕЛЫХ ЧИСЛАХ
+# ============================================================================
+
+def _digest_int(state: tuple[int, int, int], m: int, m_len: int,
+                out_bits: int) -> int:
+    """
+    Хэш от промежуточного состояния (с пустым буфером) и короткого сообщения.
+
+    Args:
+        state: (h, N, Σ) после целого числа блоков
+        m: Сообщение как big-endian число
+        m_len: Длина сообщения в байтах (0...64)
+        out_bits: 256 или 512
+
+    Returns:
+        Хэш-код как число (256 или 512 бит)
+    """
+    h, N, Sigma = state
+    if m_len == 64:
+        h = g_int(N, h, m)
+        N += 512
+        Sigma = (Sigma + m) & MASK_512
+        m, m_len = 0, 0
+
+    # Паддинг 0^(511-|M|) || 1 || M
+    last = (1 << (8 * m_len)) | m
+    h = g_int(N, h, last)
+    N = (N + 8 * m_len) & MASK_512
+    Sigma = (Sigma + last) & MASK_512
+
+    h = g_int(0, h, N)
+    h = g_int(0, h, Sigma)
+    return h if out_bits == 512 else h >> 256
+
+
+def _iterate(key: HMACKey, first: bytes, iterations: int) -> bytes:
+    """U_1 ⊕ ... ⊕ U_c для одного блока PBKDF2 (U_1 = first)"""
+    inner, outer = key.midstates()
+    out_bits = key.out_bits
+    size = out_bits // 8
+
+    u = bytes_to_int(first)
+    t = u
+    for _ in range(iterations - 1):
+        u = _digest_int(outer, _digest_int(inner, u, size, out_bits), size, out_bits)
+        t ^= u
+    return int_to_bytes(t, size)
+
+
+# ============================================================================
+# PBKDF2
+# ============================================================================
+
+def pbkdf2_streebog(password: bytes, salt: bytes, iterations: int,
+                    dklen: Optional[int] = None, out_bits: int = 512) -> bytes:
+    """
+    PBKDF2 с PRF = HMAC_GOSTR3411_2012_512 (или _256).
+
+    Args:
+        password: Пароль
+        salt: Соль
+        iterations: Число итераций (>= 1)
+        dklen: Длина выходного ключа в байтах (по умолчанию — длина хэша)
+        out_bits: 512 (как в Р 50.1.111-2016) или 256
+
+    Returns:
+        Выработанный ключ (dklen байт)
+
+    Raises:
+        ValueError: Если iterations < 1 или dklen < 1
+    """
+    if iterations < 1:
+        raise ValueError("iterations должно быть >= 1")
+    key = HMACKey(password, out_bits)
+    size = key.digest_size
+    dklen = size if dklen is None else dklen
+    if dklen < 1:
+        raise ValueError("dklen должно быть >= 1")
+
+    blocks = []
+    for i in range(1, -(-dklen // size) + 1):
+        first = key.mac(bytes(salt) + i.to_bytes(4, byteorder='big'))
+        blocks.append(_iterate(key, first, iterations))
+    return b"".join(blocks)[:dklen]
+
+
+def _pbkdf2_job(args: tuple) -> bytes:
+    return pbkdf2_streebog(*args)
+
+
+def pbkdf2_streebog_many(items: Iterable[tuple[bytes, bytes]], iterations: int,
+                         dklen: Optional[int] = None, out_bits: int = 512,
+                         workers: Optional[int] = None) -> list[bytes]:
+    """
+    Вырабатывает ключи для многих паролей в пуле процессов.
+
+    Args:
+        items: Пары (пароль, соль)
+        iterations: Число итераций
+        dklen: Длина ключей
+        out_bits: 512 или 256
+        workers: Число процессов (по умолчанию — число ядер)
+
+    Returns:
+        Ключи в порядке входных пар
+    """
+    jobs = [(password, salt, iterations, dklen, out_bits) for password, salt in items]
+    if not jobs:
+        return []
+    workers = workers or default_workers()
+    if workers == 1:
+        return [_pbkdf2_job(job) for job in jobs]
+    chunksize = max(1, len(jobs) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_pbkdf2_job, jobs, chunksize=chunksize))
+
+
+# ============================================================================
+# KDF_256 / KDF_TREE_GOSTR3411_2012_256 (по схеме RFC 7836)
+# ============================================================================
+
+def _length_bytes(bits: int) -> bytes:
+    """[L]_b — big-endian представление без ведущих нулей"""
+    return bits.to_bytes(max(1, (bits.bit_length() + 7) // 8), byteorder='big')
+
+
+class KDFTree:
+    """
+    KDF_TREE_GOSTR3411_2012_256 с однократной подготовкой ключа.
+
+    Args:
+        key: Мастер-ключ K_in
+
+    Example:
+        >>> tree = KDFTree(master_key)
+        >>> keys = tree.derive_many([(b"label", seed) for seed in seeds], 32)
+    """
+
+    def __init__(self, key: bytes):
+        self._key = HMACKey(key, 256)
+
+    def derive(self, label: bytes, seed: bytes, length: int = 32,
+               R: int = 1) -> bytes:
+        """
+        Вырабатывает length байт: K(1) || K(2) || ..., усечённое до length.
+
+        Args:
+            label: Метка
+            seed: Затравка
+            length: Длина выхода в байтах (L = 8·length бит)
+            R: Длина счётчика [i]_b в байтах (1...4)
+
+        Raises:
+            ValueError: Если R вне 1...4 или счётчик не помещается в R байт
+        """
+        if not 1 <= R <= 4:
+            raise ValueError(f"R должно быть от 1 до 4, получено {R}")
+        if length < 1:
+            raise ValueError("length должно быть >= 1")
+        blocks = -(-length // 32)
+        if blocks >= 1 << (8 * R):
+            raise ValueError(f"Счётчик не помещается в R={R} байт")
+
+        suffix = bytes(label) + b"\x00" + bytes(seed) + _length_bytes(8 * length)
+        out = b"".join(
+            self._key.mac(i.to_bytes(R, byteorder='big') + suffix)
+            for i in range(1, blocks + 1)
+        )
+        return out[:length]
+
+    def derive_many(self, requests: Iterable[tuple[bytes, bytes]],
+                    length: int = 32, R: int = 1) -> list[bytes]:
+        """
+        Вырабатывает ключи для многих пар (label, seed) на одном мастер-ключе.
+
+        Returns:
+            Ключи в порядке запросов
+        """
+        return [self.derive(label, seed, length, R) for label, seed in requests]
+
+
+def kdf_tree_256(key: bytes, label: bytes, seed: bytes, length: int,
+                 R: int = 1) -> bytes:
+    """KDF_TREE_GOSTR3411_2012_256(K_in, label, seed, R) на length байт"""
+    return KDFTree(key).derive(label, seed, length, R)
+
+
+def kdf_256(key: bytes, label: bytes, seed: bytes) -> bytes:
+    """
+    KDF_256(K_in, label, seed) =
+        HMAC_256(K_in, 0x01 || label || 0x00 || seed || 0x01 || 0x00)
+
+    Returns:
+        32 байта
+    """
+    return KDFTree(key).derive(label, seed, 32, 1)
+
+
+# ============================================================================
+# САМОТЕСТИРОВАНИЕ
+# ============================================================================
+
+def _self_check() -> None:
+    """Сверка с определениями поверх hmac_streebog"""
+    from hmac_streebog import hmac_256, hmac_512
+
+    # T_1 = U_1 ⊕ U_2, U_1 = HMAC(P, S || INT(1)), U_2 = HMAC(P, U_1)
+    for out_bits, prf in ((256, hmac_256), (512, hmac_512)):
+        u1 = prf(b"password", b"salt" + (1).to_bytes(4, 'big'))
+        u2 = prf(b"password", u1)
+        expected = bytes(a ^ b for a, b in zip(u1, u2))
+        assert pbkdf2_streebog(b"password", b"salt", 2, len(u1), out_bits) == expected
+
+    print("✓ PBKDF2-Streebog совпадает с определением")
+
+    key, label, seed = bytes(range(32)), b"\x26\xbd\xb8\x78", bytes(8)
+    assert kdf_256(key, label, seed) == \
+        hmac_256(key, b"\x01" + label + b"\x00" + seed + b"\x01\x00")
+    assert kdf_tree_256(key, label, seed, 64)[:32] == \
+        hmac_256(key, b"\x01" + label + b"\x00" + seed + b"\x02\x00")
+
+    print("✓ KDF_256 / KDF_TREE совпадают с определением")
+
+
+if __name__ == "__main__":
+    _self_check()
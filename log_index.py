@@ -0,0 +1,326 @@
+"""
+log_index.py - Хэши префиксов журналов, в которые только дописывают
+
+Аудитору нужен хэш журнала "по состоянию на смещение X". Без индекса
+каждый такой запрос хэширует журнал с нулевого байта. Индекс-спутник
+(файл рядом с журналом, по умолчанию <журнал>.sbidx) хранит состояние
+цепочки Streebog (h, N, Σ) через каждые interval байт:
+
+- хэш любого префикса считается от ближайшей контрольной точки
+  не дальше него — не больше interval байт хэширования;
+- после дописывания update() продолжает от последней точки и
+  обрабатывает только новый хвост.
+
+Формат (big-endian): заголовок — магия b"SBIX", версия (1 байт),
+out_bits (2 байта), interval (8 байт); затем записи длиной
+streebog.STATE_RECORD_SIZE — Streebog.state_bytes() после каждых
+interval байт журнала (буфер в этих точках пуст). Недописанная
+последняя запись (сбой во время update) игнорируется и
+перезаписывается.
+
+Индекс доверяет тому, что проиндексированная часть журнала не
+менялась: журнал короче проиндексированной части считается
+заменённым (ValueError), правку середины находит только verify().
+
+update() берёт на файл индекса исключительную блокировку
+fcntl.flock, поэтому несколько процессов могут пополнять один индекс
+одновременно. Где fcntl нет (Windows), писатель должен быть один.
+"""
+
+import os
+import struct
+from typing import Optional, Union
+
+from streebog import STATE_RECORD_SIZE, Streebog, update_from_fd
+
+try:
+    import fcntl
+except ImportError:  # Windows: блокировки нет, писатель должен быть один
+    fcntl = None  # type: ignore[assignment]
+
+
+INDEX_MAGIC = b"SBIX"
+INDEX_VERSION = 1
+_INDEX_HEADER = struct.Struct('>4sBHQ')
+
+# Суффикс файла индекса рядом с журналом
+INDEX_SUFFIX = ".sbidx"
+
+# Контрольная точка через каждый мегабайт (кратно 64)
+DEFAULT_INTERVAL = 1 << 20
+
+PathLike = Union[str, os.PathLike]
+
+
+class PrefixIndex:
+    """
+    Индекс контрольных точек Streebog для журнала.
+
+    Args:
+        log_path: Путь к журналу
+        index_path: Путь к индексу (по умолчанию log_path + ".sbidx")
+        interval: Байт между контрольными точками (кратно 64); для
+            существующего индекса берётся из него
+        out_bits: 256 или 512; для существующего индекса берётся из него
+
+    Raises:
+        ValueError: Если параметры не совпадают с существующим индексом
+            или файл индекса не распознан
+
+    Example:
+        >>> index = PrefixIndex("audit.log")
+        >>> index.update()            # после каждой порции дописываний
+        >>> index.digest(1_000_000)   # хэш первых 10⁶ байт
+    """
+
+    def __init__(self, log_path: PathLike, index_path: Optional[PathLike] = None,
+                 interval: Optional[int] = None, out_bits: Optional[int] = None):
+        self.log_path = os.fspath(log_path)
+        self.index_path = os.fspath(index_path) if index_path is not None \
+            else self.log_path + INDEX_SUFFIX
+
+        header = self._read_header()
+        if header is not None:
+            stored_bits, stored_interval = header
+            if out_bits not in (None, stored_bits) or \
+                    interval not in (None, stored_interval):
+                raise ValueError(
+                    f"Индекс {self.index_path} построен для out_bits={stored_bits},"
+                    f" interval={stored_interval}"
+                )
+            out_bits, interval = stored_bits, stored_interval
+
+        self.out_bits = out_bits or 256
+        self.interval = interval or DEFAULT_INTERVAL
+        if self.out_bits not in (256, 512):
+            raise ValueError(
+                f"out_bits должен быть 256 или 512, получено {self.out_bits}"
+            )
+        if self.interval <= 0 or self.interval % 64:
+            raise ValueError("interval должен быть положительным и кратным 64")
+
+    # ------------------------------------------------------------------------
+    # Файл индекса
+    # ------------------------------------------------------------------------
+
+    def _read_header(self) -> Optional[tuple[int, int]]:
+        """
+        (out_bits, interval) из заголовка или None, если индекса нет.
+
+        Неполный заголовок (сбой при создании или другой процесс внутри
+        _open_locked) считается отсутствующим индексом: update()
+        перезапишет его под блокировкой.
+        """
+        try:
+            with open(self.index_path, 'rb') as f:
+                raw = f.read(_INDEX_HEADER.size)
+        except FileNotFoundError:
+            return None
+        if len(raw) != _INDEX_HEADER.size:
+            return None
+        magic, version, out_bits, interval = _INDEX_HEADER.unpack(raw)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"{self.index_path}: это не индекс Streebog")
+        if version != INDEX_VERSION:
+            raise ValueError(f"{self.index_path}: неподдерживаемая версия {version}")
+        return out_bits, interval
+
+    @staticmethod
+    def _records(size: int) -> int:
+        """Число полных записей в индексе размером size байт"""
+        return max(0, size - _INDEX_HEADER.size) // STATE_RECORD_SIZE
+
+    @property
+    def checkpoints(self) -> int:
+        """Число полностью записанных контрольных точек"""
+        try:
+            size = os.stat(self.index_path).st_size
+        except FileNotFoundError:
+            return 0
+        return self._records(size)
+
+    @property
+    def covered(self) -> int:
+        """Смещение последней контрольной точки"""
+        return self.checkpoints * self.interval
+
+    def _state_at(self, checkpoint: int) -> Streebog:
+        """Хэшер в состоянии после checkpoint·interval байт журнала"""
+        if checkpoint == 0:
+            return Streebog(self.out_bits)
+        with open(self.index_path, 'rb') as f:
+            f.seek(_INDEX_HEADER.size + (checkpoint - 1) * STATE_RECORD_SIZE)
+            return Streebog.from_state(f.read(STATE_RECORD_SIZE))
+
+    def _check_log(self, size: int) -> None:
+        if size < self.covered:
+            raise ValueError(
+                f"{self.log_path} короче проиндексированной части"
+                f" ({size} < {self.covered}): журнал усечён или заменён,"
+                " индекс нужно пересоздать (rebuild)"
+            )
+
+    # ------------------------------------------------------------------------
+    # Запросы
+    # ------------------------------------------------------------------------
+
+    def hasher(self, offset: Optional[int] = None) -> Streebog:
+        """
+        Хэшер в состоянии после первых offset байт журнала.
+
+        Хэширует байты от ближайшей контрольной точки до offset: не
+        больше interval, если update() вызывался после дописывания.
+
+        Args:
+            offset: Длина префикса (по умолчанию — весь журнал)
+
+        Raises:
+            ValueError: Если offset за концом журнала или журнал заменён
+        """
+        with open(self.log_path, 'rb', buffering=0) as f:
+            fd = f.fileno()
+            size = os.fstat(fd).st_size
+            self._check_log(size)
+            if offset is None:
+                offset = size
+            if not 0 <= offset <= size:
+                raise ValueError(f"Смещение {offset} вне журнала (0..{size})")
+
+            checkpoint = min(offset // self.interval, self.checkpoints)
+            hasher = self._state_at(checkpoint)
+            update_from_fd(hasher, fd, checkpoint * self.interval, offset)
+        return hasher
+
+    def digest(self, offset: Optional[int] = None) -> bytes:
+        """Хэш первых offset байт журнала (по умолчанию — всего журнала)"""
+        return self.hasher(offset).digest()
+
+    # ------------------------------------------------------------------------
+    # Пополнение и проверка
+    # ------------------------------------------------------------------------
+
+    def update(self) -> int:
+        """
+        Добавляет контрольные точки для дописанной части журнала.
+
+        Хэширует только байты после последней контрольной точки. Число
+        точек читается уже под блокировкой индекса: параллельный
+        update() другого процесса ждёт и продолжает с его последней
+        точки, а не дописывает те же записи повторно.
+
+        Returns:
+            Число новых контрольных точек
+
+        Raises:
+            ValueError: Если журнал короче проиндексированной части
+        """
+        with open(self.log_path, 'rb', buffering=0) as log, \
+                self._open_locked() as index:
+            fd = log.fileno()
+            size = os.fstat(fd).st_size
+            self._check_log(size)
+            count = self._records(os.fstat(index.fileno()).st_size)
+            target = size // self.interval
+            if target <= count:
+                return 0
+
+            hasher = self._state_at(count)
+            # Отбрасываем недописанную запись, если она есть
+            index.truncate(_INDEX_HEADER.size + count * STATE_RECORD_SIZE)
+            index.seek(0, os.SEEK_END)
+            for checkpoint in range(count + 1, target + 1):
+                update_from_fd(hasher, fd, (checkpoint - 1) * self.interval,
+                               checkpoint * self.interval)
+                index.write(hasher.state_bytes())
+            index.flush()
+            os.fsync(index.fileno())
+        return target - count
+
+    def _open_locked(self):
+        """
+        Открывает индекс на запись под исключительной блокировкой
+        (создаёт при отсутствии). Блокировка снимается при закрытии.
+        """
+        flags = os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0)
+        index = open(os.open(self.index_path, flags, 0o666), 'r+b')
+        try:
+            if fcntl is not None:
+                fcntl.flock(index.fileno(), fcntl.LOCK_EX)
+            if os.fstat(index.fileno()).st_size < _INDEX_HEADER.size:
+                index.truncate(0)
+                index.write(_INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION,
+                                               self.out_bits, self.interval))
+            elif self._read_header() != (self.out_bits, self.interval):
+                # Заголовок дописал другой процесс с другими параметрами
+                raise ValueError(
+                    f"Индекс {self.index_path} построен для других"
+                    " out_bits/interval"
+                )
+        except BaseException:
+            index.close()
+            raise
+        return index
+
+    def rebuild(self) -> int:
+        """
+        Строит индекс заново (после замены или усечения журнала).
+
+        Удаляет файл индекса, поэтому не должен идти одновременно с
+        update() других процессов.
+        """
+        try:
+            os.unlink(self.index_path)
+        except FileNotFoundError:
+            pass
+        return self.update()
+
+    def verify(self) -> bool:
+        """
+        Перехэширует журнал целиком и сверяет все контрольные точки.
+
+        Returns:
+            True, если проиндексированная часть журнала не менялась
+        """
+        count = self.checkpoints
+        with open(self.log_path, 'rb', buffering=0) as log:
+            fd = log.fileno()
+            if os.fstat(fd).st_size < count * self.interval:
+                return False
+            hasher = Streebog(self.out_bits)
+            for checkpoint in range(1, count + 1):
+                update_from_fd(hasher, fd, (checkpoint - 1) * self.interval,
+                               checkpoint * self.interval)
+                if hasher.state_bytes() != self._state_at(checkpoint).state_bytes():
+                    return False
+        return True
+
+
+# ============================================================================
+# САМОТЕСТИРОВАНИЕ
+# ============================================================================
+
+def _self_check() -> None:
+    """Хэши префиксов совпадают с hash_256 до и после дописывания"""
+    import tempfile
+    from streebog import hash_256
+
+    data = bytes(range(256)) * 12
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "audit.log")
+        with open(path, "wb") as f:
+            f.write(data[:1000])
+
+        index = PrefixIndex(path, interval=256)
+        assert index.update() == 3
+        with open(path, "ab") as f:
+            f.write(data[1000:])
+        assert index.update() == 9
+        for offset in (0, 63, 256, 1000, 1500, len(data)):
+            assert index.digest(offset) == hash_256(data[:offset])
+        assert index.verify()
+
+    print("✓ Индекс префиксов журнала работает корректно")
+
+
+if __name__ == "__main__":
+    _self_check()
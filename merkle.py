@@ -0,0 +1,323 @@
+"""
+merkle.py - Древовидный (Merkle) режим хэширования на ГОСТ 34.11-2018
+
+Цепочка функции сжатия последовательна, поэтому один большой файл
+хэшируется на одном ядре. В древовидном режиме вход режется на
+листья фиксированного размера, листья хэшируются параллельно,
+а корень собирается из хэшей с разделением доменов:
+
+    лист:  H(0x00 || данные листа)
+    узел:  H(0x01 || левый || правый)
+
+Непарный последний узел уровня переносится на уровень выше без
+изменений. Корень дерева — не то же самое, что hash_256/hash_512
+от всего файла: это отдельный, явно включаемый режим.
+
+Доказательство включения листа — список (хэш соседа, сосед слева?)
+от листа к корню; после правки части файла пересчитываются только
+затронутые листья и их пути к корню.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional, Union
+
+from parallel import default_workers
+from streebog import Streebog
+
+
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+# Размер листа по умолчанию (кратно 64)
+DEFAULT_LEAF_SIZE = 1 << 20
+
+# Сколько байт листьев отдавать одному заданию пула
+TASK_BYTES = 16 << 20
+
+Proof = list[tuple[bytes, bool]]
+
+
+# ============================================================================
+# ХЭШИ ЛИСТЬЕВ И УЗЛОВ
+# ============================================================================
+
+def leaf_hash(data, out_bits: int = 256) -> bytes:
+    """H(0x00 || data)"""
+    hasher = Streebog(out_bits, LEAF_PREFIX)
+    hasher.update(data)
+    return hasher.digest()
+
+
+def node_hash(left: bytes, right: bytes, out_bits: int = 256) -> bytes:
+    """H(0x01 || left || right)"""
+    return Streebog(out_bits, NODE_PREFIX + left + right).digest()
+
+
+def _hash_leaf_range(path: Union[str, os.PathLike], start: int, count: int,
+                     leaf_size: int, out_bits: int) -> list[bytes]:
+    """Хэширует count листьев файла, начиная с листа start"""
+    buffer = bytearray(leaf_size)
+    digests = []
+    with open(path, 'rb', buffering=0) as f, memoryview(buffer) as view:
+        f.seek(start * leaf_size)
+        for _ in range(count):
+            filled = 0
+            while filled < leaf_size:
+                n = f.readinto(view[filled:])
+                if not n:
+                    break
+                filled += n
+            digests.append(leaf_hash(view[:filled], out_bits))
+    return digests
+
+
+def _leaf_count(size: int, leaf_size: int) -> int:
+    # Пустой вход — один пустой лист
+    return max(1, -(-size // leaf_size))
+
+
+# ============================================================================
+# ДЕРЕВО
+# ============================================================================
+
+class MerkleTree:
+    """
+    Дерево Меркла над хэшами листьев.
+
+    Args:
+        leaves: Хэши листьев (leaf_hash)
+        out_bits: 256 или 512
+        leaf_size: Размер листа в байтах (для работы с файлами)
+        size: Размер входа в байтах (для refresh_file; None — неизвестен)
+    """
+
+    def __init__(self, leaves: Iterable[bytes], out_bits: int = 256,
+                 leaf_size: int = DEFAULT_LEAF_SIZE, size: Optional[int] = None):
+        if out_bits not in (256, 512):
+            raise ValueError(f"out_bits должен быть 256 или 512, получено {out_bits}")
+        if leaf_size <= 0 or leaf_size % 64:
+            raise ValueError("leaf_size должен быть положительным и кратным 64")
+
+        self.out_bits = out_bits
+        self.leaf_size = leaf_size
+        self.size = size
+        self.levels: list[list[bytes]] = [list(leaves)]
+        if not self.levels[0]:
+            raise ValueError("Дерево должно содержать хотя бы один лист")
+        self._build()
+
+    def _build(self) -> None:
+        """Пересчитывает все уровни над листьями"""
+        del self.levels[1:]
+        level = self.levels[0]
+        while len(level) > 1:
+            parent = [node_hash(level[i], level[i + 1], self.out_bits)
+                      for i in range(0, len(level) - 1, 2)]
+            if len(level) % 2:
+                parent.append(level[-1])
+            self.levels.append(parent)
+            level = parent
+
+    @property
+    def root(self) -> bytes:
+        """Корень дерева"""
+        return self.levels[-1][0]
+
+    @property
+    def leaf_count(self) -> int:
+        return len(self.levels[0])
+
+    def proof(self, index: int) -> Proof:
+        """
+        Доказательство включения листа index.
+
+        Returns:
+            Список (хэш соседа, сосед слева?) от листа к корню
+        """
+        if not 0 <= index < self.leaf_count:
+            raise IndexError(f"Нет листа с индексом {index}")
+
+        path = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                path.append((level[sibling], sibling < index))
+            index //= 2
+        return path
+
+    def set_leaf(self, index: int, digest: bytes) -> None:
+        """Заменяет хэш листа и пересчитывает только путь до корня"""
+        self.levels[0][index] = digest
+        for depth in range(1, len(self.levels)):
+            below = self.levels[depth - 1]
+            index //= 2
+            left = 2 * index
+            if left + 1 < len(below):
+                value = node_hash(below[left], below[left + 1], self.out_bits)
+            else:
+                value = below[left]
+            self.levels[depth][index] = value
+
+    # ------------------------------------------------------------------------
+    # Построение
+    # ------------------------------------------------------------------------
+
+    @classmethod
+    def from_bytes(cls, data, out_bits: int = 256,
+                   leaf_size: int = DEFAULT_LEAF_SIZE) -> "MerkleTree":
+        """Строит дерево над буфером в текущем процессе"""
+        with memoryview(data) as raw, raw.cast('B') as view:
+            count = _leaf_count(len(view), leaf_size)
+            leaves = [leaf_hash(view[i * leaf_size:(i + 1) * leaf_size], out_bits)
+                      for i in range(count)]
+            size = len(view)
+        return cls(leaves, out_bits, leaf_size, size)
+
+    @classmethod
+    def from_file(cls, path: Union[str, os.PathLike], out_bits: int = 256,
+                  leaf_size: int = DEFAULT_LEAF_SIZE,
+                  workers: Optional[int] = None) -> "MerkleTree":
+        """
+        Строит дерево над файлом, хэшируя листья в пуле процессов.
+
+        Args:
+            path: Путь к файлу
+            out_bits: 256 или 512
+            leaf_size: Размер листа (кратно 64)
+            workers: Число процессов (по умолчанию — число ядер; 1 — без пула)
+        """
+        size = os.stat(path).st_size
+        count = _leaf_count(size, leaf_size)
+        per_task = max(1, TASK_BYTES // leaf_size)
+        tasks = [(start, min(per_task, count - start))
+                 for start in range(0, count, per_task)]
+
+        if workers is None:
+            workers = default_workers()
+
+        if workers <= 1 or len(tasks) == 1:
+            parts = [_hash_leaf_range(path, start, n, leaf_size, out_bits)
+                     for start, n in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_hash_leaf_range, path, start, n,
+                                       leaf_size, out_bits)
+                           for start, n in tasks]
+                parts = [future.result() for future in futures]
+
+        return cls([d for part in parts for d in part], out_bits, leaf_size, size)
+
+    def refresh_file(self, path: Union[str, os.PathLike],
+                     ranges: Iterable[tuple[int, int]]) -> bytes:
+        """
+        Обновляет дерево после правки байт [start, end) файла.
+
+        Если размер файла не изменился, пересчитываются только
+        затронутые листья и их пути. Если изменился (даже при том же
+        числе листьев) — листья от первого затронутого, но не дальше
+        последнего листа старой и новой длины, до конца файла, а уровни
+        над листьями строятся заново. Для дерева с неизвестным размером
+        (size=None) изменением размера считается изменение числа листьев.
+
+        Args:
+            path: Путь к изменённому файлу
+            ranges: Изменённые диапазоны байт [start, end)
+
+        Returns:
+            Новый корень
+        """
+        leaf_size = self.leaf_size
+        size = os.stat(path).st_size
+        count = _leaf_count(size, leaf_size)
+        touched = sorted({i for start, end in ranges
+                          for i in range(start // leaf_size,
+                                         max(start, end - 1) // leaf_size + 1)})
+
+        if self.size is not None:
+            resized = size != self.size
+        else:
+            resized = count != self.leaf_count
+        self.size = size
+
+        if not resized:
+            for index in touched:
+                if index < count:
+                    digest, = _hash_leaf_range(path, index, 1, leaf_size, self.out_bits)
+                    self.set_leaf(index, digest)
+            return self.root
+
+        # Последний лист старой или новой длины мог быть неполным
+        first = max(0, min(touched + [self.leaf_count - 1, count - 1]))
+        leaves = self.levels[0][:first]
+        leaves += _hash_leaf_range(path, first, count - first, leaf_size, self.out_bits)
+        self.levels = [leaves]
+        self._build()
+        return self.root
+
+
+# ============================================================================
+# ПРОВЕРКА ДОКАЗАТЕЛЬСТВ
+# ============================================================================
+
+def verify_proof(root: bytes, leaf_digest: bytes, proof: Proof,
+                 out_bits: int = 256) -> bool:
+    """
+    Проверяет доказательство включения по хэшу листа.
+
+    Args:
+        root: Ожидаемый корень
+        leaf_digest: Хэш листа (leaf_hash)
+        proof: Результат MerkleTree.proof()
+        out_bits: 256 или 512
+
+    Returns:
+        True, если путь приводит к root
+    """
+    node = leaf_digest
+    for sibling, sibling_is_left in proof:
+        if sibling_is_left:
+            node = node_hash(sibling, node, out_bits)
+        else:
+            node = node_hash(node, sibling, out_bits)
+    return node == root
+
+
+def verify_leaf(root: bytes, data, proof: Proof, out_bits: int = 256) -> bool:
+    """Проверяет доказательство включения по данным листа"""
+    return verify_proof(root, leaf_hash(data, out_bits), proof, out_bits)
+
+
+def merkle_root(data, out_bits: int = 256,
+                leaf_size: int = DEFAULT_LEAF_SIZE) -> bytes:
+    """Корень дерева над буфером"""
+    return MerkleTree.from_bytes(data, out_bits, leaf_size).root
+
+
+def merkle_root_file(path: Union[str, os.PathLike], out_bits: int = 256,
+                     leaf_size: int = DEFAULT_LEAF_SIZE,
+                     workers: Optional[int] = None) -> bytes:
+    """Корень дерева над файлом (листья хэшируются параллельно)"""
+    return MerkleTree.from_file(path, out_bits, leaf_size, workers).root
+
+
+# ============================================================================
+# САМОТЕСТИРОВАНИЕ
+# ============================================================================
+
+def _self_check() -> None:
+    """Проверка доказательств на небольшом дереве"""
+    data = bytes(range(256)) * 5
+    tree = MerkleTree.from_bytes(data, 256, leaf_size=128)
+    assert tree.leaf_count == 10
+
+    for index in range(tree.leaf_count):
+        chunk = data[index * 128:(index + 1) * 128]
+        assert verify_leaf(tree.root, chunk, tree.proof(index))
+        assert not verify_leaf(tree.root, chunk + b"x", tree.proof(index))
+
+    print("✓ Дерево Меркла и доказательства включения работают корректно")
+
+
+if __name__ == "__main__":
+    _self_check()
@@ -0,0 +1,519 @@
+"""
+parallel.py - Параллельное хэширование ГОСТ 34.11-2018 в пуле процессов
+
+Хэширование на чистом Python упирается в GIL, поэтому много сообщений
+или файлов распределяются по ProcessPoolExecutor размером в число ядер:
+
+- мелкие входы объединяются в пачки, чтобы не платить за pickle
+  на каждое сообщение;
+- крупные буферы передаются через multiprocessing.shared_memory,
+  а не копируются через канал процесса;
+- результаты отдаются в порядке входа (hash_many / hash_files) или
+  по мере готовности (iter_hash_many / iter_hash_files).
+
+Для сообщений есть и пул потоков (hash_many_threads): без pickle,
+копирования и запуска процессов. Под GIL потоки хэшируют по очереди,
+на сборке без GIL (CPython 3.13t) — параллельно; см. gil_enabled().
+
+concurrent.futures и multiprocessing импортируются при первом
+параллельном вызове: утилите командной строки без -j они не нужны.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    TypeVar,
+    Union,
+)
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+from streebog import Streebog, hash_file
+
+
+# Пачка мелких сообщений набирается до этого объёма...
+CHUNK_BYTES = 1 << 20
+# ...или до этого числа элементов
+CHUNK_ITEMS = 256
+# Сообщения от этого размера передаются через разделяемую память
+SHARED_MEMORY_THRESHOLD = 4 << 20
+# Пачка для пула потоков: pickle нет, мелкие пачки дешевле делить между потоками
+THREAD_CHUNK_BYTES = 64 << 10
+
+
+# Результат рабочей функции для одного элемента пачки
+_T = TypeVar('_T')
+
+# Рабочая функция: (пачка, out_bits) -> [(индекс, результат)]
+_ChunkFn = Callable[[list, int], list[tuple[int, _T]]]
+
+
+class FileResult(NamedTuple):
+    """Результат хэширования одного файла"""
+    digest: Optional[bytes]
+    error: Optional[OSError]
+    size: int
+    seconds: float
+
+
+class _SharedRef(NamedTuple):
+    """Ссылка на сообщение в разделяемой памяти"""
+    name: str
+    size: int
+
+
+# ============================================================================
+# РАБОЧИЕ ФУНКЦИИ (выполняются в дочерних процессах)
+# ============================================================================
+
+def _hash_buffer(data, out_bits: int) -> bytes:
+    hasher = Streebog(out_bits)
+    hasher.update(data)
+    return hasher.final()
+
+
+def _hash_message_chunk(items: list, out_bits: int) -> list[tuple[int, bytes]]:
+    """Хэширует пачку (индекс, сообщение или _SharedRef)"""
+    results = []
+    for index, payload in items:
+        if isinstance(payload, _SharedRef):
+            from multiprocessing import shared_memory
+            shm = shared_memory.SharedMemory(name=payload.name)
+            try:
+                assert shm.buf is not None
+                view = shm.buf[:payload.size]
+                try:
+                    digest = _hash_buffer(view, out_bits)
+                finally:
+                    view.release()
+            finally:
+                shm.close()
+        else:
+            digest = _hash_buffer(payload, out_bits)
+        results.append((index, digest))
+    return results
+
+
+def _hash_path_chunk(items: list, out_bits: int) -> list[tuple[int, bytes]]:
+    """Хэширует пачку (индекс, путь)"""
+    return [(index, hash_file(path, out_bits)) for index, path in items]
+
+
+def file_result(path, out_bits: int) -> FileResult:
+    """
+    Хэширует файл, возвращая хэш или ошибку вместе с размером и временем.
+
+    Args:
+        path: Путь к файлу
+        out_bits: 256 или 512
+
+    Returns:
+        FileResult; при ошибке чтения digest = None, error — OSError
+    """
+    start = time.perf_counter()
+    try:
+        digest = hash_file(path, out_bits)
+        size = os.stat(path).st_size
+    except OSError as e:
+        return FileResult(None, e, 0, time.perf_counter() - start)
+    return FileResult(digest, None, size, time.perf_counter() - start)
+
+
+def _file_result_chunk(items: list, out_bits: int) -> list[tuple[int, FileResult]]:
+    """Хэширует пачку (индекс, путь) в FileResult"""
+    return [(index, file_result(path, out_bits)) for index, path in items]
+
+
+def _hash_path_chunk_safe(items: list, out_bits: int
+                          ) -> list[tuple[int, Union[bytes, OSError]]]:
+    """Как _hash_path_chunk, но OSError возвращается вместо хэша"""
+    results: list[tuple[int, Union[bytes, OSError]]] = []
+    for index, path in items:
+        try:
+            results.append((index, hash_file(path, out_bits)))
+        except OSError as e:
+            results.append((index, e))
+    return results
+
+
+# ============================================================================
+# ПЛАНИРОВАНИЕ
+# ============================================================================
+
+def default_workers() -> int:
+    """Число доступных процессу ядер"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def gil_enabled() -> bool:
+    """
+    Работает ли интерпретатор под GIL.
+
+    False только на сборке без GIL (3.13t), где GIL не был включён
+    обратно (PYTHON_GIL=1 или модуль-расширение без поддержки).
+    """
+    check = getattr(sys, '_is_gil_enabled', None)
+    return True if check is None else check()
+
+
+def _chunks(sized_items: Iterable[tuple[int, object, int]],
+            limit: Optional[int] = None) -> Iterator[list]:
+    """
+    Группирует (индекс, элемент, размер) в пачки по limit байт
+    (по умолчанию CHUNK_BYTES) или CHUNK_ITEMS элементов.
+
+    Элемент размером не меньше limit всегда уходит отдельной пачкой.
+    """
+    limit = limit or CHUNK_BYTES
+    chunk: list = []
+    chunk_bytes = 0
+    for index, item, size in sized_items:
+        if size >= limit:
+            yield [(index, item)]
+            continue
+        chunk.append((index, item))
+        chunk_bytes += size
+        if chunk_bytes >= limit or len(chunk) >= CHUNK_ITEMS:
+            yield chunk
+            chunk, chunk_bytes = [], 0
+    if chunk:
+        yield chunk
+
+
+def _run(executor: Executor, fn: _ChunkFn[_T],
+         chunks: Iterator[tuple[list, list]], out_bits: int,
+         window: int) -> Iterator[tuple[int, _T]]:
+    """
+    Отправляет пачки в пул, держа в работе не больше `window` задач.
+
+    chunks выдаёт пары (пачка, сегменты разделяемой памяти пачки);
+    сегменты освобождаются, как только пачка обработана.
+    """
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    pending: dict = {}
+
+    def drain(done):
+        for future in done:
+            segments = pending.pop(future)
+            try:
+                yield from future.result()
+            finally:
+                for shm in segments:
+                    shm.close()
+                    shm.unlink()
+
+    try:
+        for chunk, segments in chunks:
+            if len(pending) >= window:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                yield from drain(done)
+            pending[executor.submit(fn, chunk, out_bits)] = segments
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            yield from drain(done)
+    finally:
+        for future, segments in pending.items():
+            future.cancel()
+            for shm in segments:
+                shm.close()
+                shm.unlink()
+
+
+def _iter_parallel(fn: _ChunkFn[_T], chunks: Iterator[tuple[list, list]],
+                   out_bits: int, workers: Optional[int],
+                   executor: Optional[Executor]) -> Iterator[tuple[int, _T]]:
+    if out_bits not in (256, 512):
+        raise ValueError(f"out_bits должен быть 256 или 512, получено {out_bits}")
+
+    workers = workers or default_workers()
+    window = 4 * workers
+
+    if executor is not None:
+        yield from _run(executor, fn, chunks, out_bits, window)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from _run(pool, fn, chunks, out_bits, window)
+
+
+def _collect(results: Iterator[tuple[int, bytes]], count: int) -> list[bytes]:
+    ordered: list = [None] * count
+    for index, digest in results:
+        ordered[index] = digest
+    return ordered
+
+
+# ============================================================================
+# СООБЩЕНИЯ
+# ============================================================================
+
+def _message_chunks(messages: Iterable) -> Iterator[tuple[list, list]]:
+    from multiprocessing import shared_memory
+
+    segments: dict = {}
+
+    def placed():
+        # Крупные буферы копируются в разделяемую память один раз
+        for index, message in enumerate(messages):
+            view = memoryview(message).cast('B')
+            size = view.nbytes
+            if size >= SHARED_MEMORY_THRESHOLD:
+                shm = shared_memory.SharedMemory(create=True, size=size)
+                shm.buf[:size] = view
+                segments[shm.name] = shm
+                yield index, _SharedRef(shm.name, size), size
+            else:
+                yield index, bytes(view), size
+
+    try:
+        for chunk in _chunks(placed()):
+            owned = [segments.pop(payload.name) for _, payload in chunk
+                     if isinstance(payload, _SharedRef)]
+            yield chunk, owned
+    finally:
+        for shm in segments.values():
+            shm.close()
+            shm.unlink()
+
+
+def iter_hash_many(messages: Iterable, out_bits: int = 512,
+                   workers: Optional[int] = None,
+                   executor: Optional[Executor] = None
+                   ) -> Iterator[tuple[int, bytes]]:
+    """
+    Хэширует сообщения в пуле процессов, выдавая результаты по готовности.
+
+    Args:
+        messages: Сообщения (bytes или любые объекты с buffer protocol)
+        out_bits: 256 или 512
+        workers: Число процессов (по умолчанию — число ядер)
+        executor: Готовый пул процессов (тогда workers задаёт только окно)
+
+    Yields:
+        Пары (индекс сообщения, хэш) в порядке завершения
+    """
+    yield from _iter_parallel(
+        _hash_message_chunk, _message_chunks(messages), out_bits, workers, executor
+    )
+
+
+def hash_many(messages: Iterable, out_bits: int = 512,
+              workers: Optional[int] = None,
+              executor: Optional[Executor] = None) -> list[bytes]:
+    """
+    Хэширует сообщения в пуле процессов.
+
+    Args:
+        messages: Сообщения (bytes или любые объекты с buffer protocol)
+        out_bits: 256 или 512
+        workers: Число процессов (по умолчанию — число ядер)
+        executor: Готовый пул процессов
+
+    Returns:
+        Список хэшей в порядке входных сообщений
+
+    Example:
+        >>> hash_many([b"a", b"b"], 256) == [hash_256(b"a"), hash_256(b"b")]
+        True
+    """
+    messages = list(messages)
+    return _collect(
+        iter_hash_many(messages, out_bits, workers, executor), len(messages)
+    )
+
+
+# ============================================================================
+# СООБЩЕНИЯ В ПУЛЕ ПОТОКОВ
+# ============================================================================
+
+def _nbytes(message) -> int:
+    with memoryview(message) as view:
+        return view.nbytes
+
+
+def _thread_chunks(messages: Iterable) -> Iterator[tuple[list, list]]:
+    # Потоки видят те же объекты: сообщения не копируются
+    sized = ((index, message, _nbytes(message))
+             for index, message in enumerate(messages))
+    for chunk in _chunks(sized, THREAD_CHUNK_BYTES):
+        yield chunk, []
+
+
+def iter_hash_many_threads(messages: Iterable, out_bits: int = 512,
+                           workers: Optional[int] = None,
+                           executor: Optional[Executor] = None
+                           ) -> Iterator[tuple[int, bytes]]:
+    """
+    Хэширует сообщения в пуле потоков, выдавая результаты по готовности.
+
+    Каждый поток работает со своими объектами Streebog, поэтому
+    синхронизация не нужна. Сообщения не должны меняться до конца
+    хэширования.
+
+    Args:
+        messages: Сообщения (bytes или любые объекты с buffer protocol)
+        out_bits: 256 или 512
+        workers: Число потоков (по умолчанию — число ядер)
+        executor: Готовый пул потоков (тогда workers задаёт только окно)
+
+    Yields:
+        Пары (индекс сообщения, хэш) в порядке завершения
+    """
+    if out_bits not in (256, 512):
+        raise ValueError(f"out_bits должен быть 256 или 512, получено {out_bits}")
+
+    workers = workers or default_workers()
+    window = 4 * workers
+    chunks = _thread_chunks(messages)
+
+    if executor is not None:
+        yield from _run(executor, _hash_message_chunk, chunks, out_bits, window)
+        return
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        yield from _run(pool, _hash_message_chunk, chunks, out_bits, window)
+
+
+def hash_many_threads(messages: Iterable, out_bits: int = 512,
+                      workers: Optional[int] = None,
+                      executor: Optional[Executor] = None) -> list[bytes]:
+    """
+    Хэширует сообщения в пуле потоков.
+
+    Масштабируется по ядрам только на сборке без GIL; под GIL
+    работает со скоростью одного потока (см. hash_many).
+
+    Returns:
+        Список хэшей в порядке входных сообщений
+
+    Example:
+        >>> hash_many_threads([b"a", b"b"], 256) == [hash_256(b"a"), hash_256(b"b")]
+        True
+    """
+    messages = list(messages)
+    return _collect(
+        iter_hash_many_threads(messages, out_bits, workers, executor), len(messages)
+    )
+
+
+# ============================================================================
+# ФАЙЛЫ
+# ============================================================================
+
+def _path_chunks(paths: Iterable) -> Iterator[tuple[list, list]]:
+    def sized():
+        for index, path in enumerate(paths):
+            try:
+                size = os.stat(path).st_size
+            except OSError:
+                # Ошибку увидит рабочий процесс при открытии файла
+                size = 0
+            yield index, path, size
+
+    for chunk in _chunks(sized()):
+        yield chunk, []
+
+
+def iter_hash_files(paths: Iterable, out_bits: int = 512,
+                    workers: Optional[int] = None,
+                    executor: Optional[Executor] = None,
+                    return_exceptions: bool = False
+                    ) -> Iterator[tuple[int, Union[bytes, OSError]]]:
+    """
+    Хэширует файлы в пуле процессов, выдавая результаты по готовности.
+
+    Файлы читают сами рабочие процессы; через канал передаются только пути.
+
+    Args:
+        return_exceptions: Выдавать OSError вместо хэша для нечитаемых
+            файлов, а не прерывать всю обработку
+
+    Yields:
+        Пары (индекс пути, хэш или OSError) в порядке завершения
+
+    Raises:
+        OSError: Если файл не удалось прочитать (без return_exceptions)
+    """
+    chunks = _path_chunks(paths)
+    if return_exceptions:
+        yield from _iter_parallel(_hash_path_chunk_safe, chunks, out_bits,
+                                  workers, executor)
+    else:
+        yield from _iter_parallel(_hash_path_chunk, chunks, out_bits,
+                                  workers, executor)
+
+
+def iter_file_results(paths: Iterable, out_bits: int = 512,
+                      workers: Optional[int] = None,
+                      executor: Optional[Executor] = None
+                      ) -> Iterator[tuple[int, FileResult]]:
+    """
+    Как iter_hash_files, но выдаёт FileResult с размером и временем хэширования.
+
+    Ошибки чтения не прерывают обработку, а попадают в FileResult.error.
+
+    Yields:
+        Пары (индекс пути, FileResult) в порядке завершения
+    """
+    yield from _iter_parallel(
+        _file_result_chunk, _path_chunks(paths), out_bits, workers, executor
+    )
+
+
+def hash_files(paths: Iterable, out_bits: int = 512,
+               workers: Optional[int] = None,
+               executor: Optional[Executor] = None) -> list[bytes]:
+    """
+    Хэширует файлы в пуле процессов.
+
+    Returns:
+        Список хэшей в порядке входных путей
+
+    Raises:
+        OSError: Если файл не удалось прочитать
+    """
+    paths = list(paths)
+    return _collect(
+        _iter_parallel(_hash_path_chunk, _path_chunks(paths), out_bits,
+                       workers, executor),
+        len(paths)
+    )
+
+
+# ============================================================================
+# САМОТЕСТИРОВАНИЕ
+# ============================================================================
+
+def _self_check() -> None:
+    """Сверка параллельного хэширования с последовательным"""
+    from streebog import hash_256, hash_512
+
+    messages = [bytes([i % 256]) * (i * 37) for i in range(200)]
+    messages.append(b"\xab" * (SHARED_MEMORY_THRESHOLD + 1))
+
+    assert hash_many(messages, 512) == [hash_512(m) for m in messages]
+    assert sorted(iter_hash_many(messages[:50], 256)) == \
+        [(i, hash_256(m)) for i, m in enumerate(messages[:50])]
+    assert hash_many_threads(messages[:50], 256) == \
+        [hash_256(m) for m in messages[:50]]
+
+    print("✓ Параллельное хэширование совпадает с последовательным")
+
+
+if __name__ == "__main__":
+    _self_check()
@@ -3,21 +3,41 @@ streebog.py - Основной алгоритм ГОСТ 34.11-2018 (Стриб
 
 Реализация функции хэширования с поддержкой 256 и 512 бит.
 Потоковый API для обработки данных произвольной длины.
+
+Запуск модуля (python -m streebog) — утилита командной строки, см. cli.py.
 """
 
-from typing import Optional
+import io
+import mmap
+import os
+import stat
+import struct
+from typing import Optional, Union
+from backends import get_backend
 from constants import IV_512, IV_256
-from compression import g
 from utils import (
-    add_mod_2n_512,
-    chunk_64,
+    MASK_512,
     pad_last_block,
     bytes_to_int,
     int_to_bytes,
-    xor_bytes
 )
 
 
+# Окно отображения файла в память (кратно 64 и гранулярности mmap)
+MMAP_WINDOW = 64 << 20
+
+# Буфер чтения для каналов и сокетов (кратно 64)
+READ_BUFFER_SIZE = 1 << 20
+
+# Формат экспорта состояния: заголовок, затем h, N, Σ (по 64 байта) и хвост
+STATE_MAGIC = b"STRB"
+STATE_VERSION = 1
+_STATE_HEADER = struct.Struct('>4sBHB')
+
+# Длина state_bytes() при пустом буфере (после целого числа блоков)
+STATE_RECORD_SIZE = _STATE_HEADER.size + 3 * 64
+
+
 # ============================================================================
 # КЛАСС STREEBOG - ПОТОКОВЫЙ ИНТЕРФЕЙС
 # ============================================================================
@@ -28,6 +48,21 @@ class Streebog:
     
     Поддерживает потоковую обработку данных с накоплением состояния.
     
+    Внутреннее состояние (h, N, Σ) хранится в виде 512-битных целых
+    чисел (см. int_compression.py); в bytes оно переводится только
+    в digest(). Функция сжатия берётся из реестра backends.py при
+    создании хэшера.
+    
+    Совместим с интерфейсом объектов hashlib: name, digest_size,
+    block_size, update(), digest(), hexdigest(), copy().
+
+    Потокобезопасность: независимые хэшеры можно использовать из
+    разных потоков одновременно, в том числе на сборках без GIL
+    (3.13t): общие для них константы и таблицы неизменяемы, а всё
+    изменяемое состояние принадлежит объекту. Один хэшер из нескольких
+    потоков без внешней блокировки не используется — для ветвления
+    состояния есть copy().
+
     Args:
         out_bits: Длина выходного хэша (256 или 512 бит)
         
@@ -39,12 +74,16 @@ class Streebog:
         '...'
     """
     
-    def __init__(self, out_bits: int = 512):
+    # Размер блока в байтах (интерфейс hashlib)
+    block_size = 64
+    
+    def __init__(self, out_bits: int = 512, data=None):
         """
         Инициализация хэшера.
         
         Args:
             out_bits: 256 или 512
+            data: Необязательные начальные данные (как в hashlib)
             
         Raises:
             ValueError: Если out_bits не 256 и не 512
@@ -54,26 +93,49 @@ class Streebog:
         
         self.out_bits = out_bits
         
+        # Функция сжатия g_N(h, m) над 512-битными числами
+        self._g = get_backend().g
+        
         # Инициализационный вектор
-        self.h = IV_512 if out_bits == 512 else IV_256
+        self.h = bytes_to_int(IV_512 if out_bits == 512 else IV_256)
         
         # Счётчик обработанных бит (mod 2^512)
-        self.N = bytes(64)
+        self.N = 0
         
         # Контрольная сумма (сумма блоков mod 2^512)
-        self.Sigma = bytes(64)
+        self.Sigma = 0
         
         # Буфер для неполных блоков
         self.buffer = bytearray()
         
         # Флаг финализации
         self._finalized = False
+        
+        if data is not None:
+            self.update(data)
+    
+    
+    @property
+    def name(self) -> str:
+        """Имя алгоритма (интерфейс hashlib)"""
+        return f"streebog{self.out_bits}"
+    
+    
+    @property
+    def digest_size(self) -> int:
+        """Длина хэша в байтах (интерфейс hashlib)"""
+        return self.out_bits // 8
     
     
-    def update(self, data: bytes) -> None:
+    def update(self, data) -> None:
         """
         Добавляет данные в хэш.
         
+        Принимает любой объект с buffer protocol (bytes, bytearray,
+        memoryview, mmap, массивы NumPy). Полные блоки читаются прямо
+        из memoryview входа без копирования; между вызовами хранится
+        только хвост короче 64 байт.
+        
         Args:
             data: Блок данных произвольной длины
             
@@ -83,66 +145,238 @@ class Streebog:
         if self._finalized:
             raise RuntimeError("Нельзя вызывать update() после final()")
         
-        # Добавляем в буфер
-        self.buffer.extend(data)
-        
-        # Обрабатываем полные блоки по 64 байта
-        while len(self.buffer) >= 64:
-            block = bytes(self.buffer[:64])
-            self.buffer = self.buffer[64:]
+        with memoryview(data) as raw, raw.cast('B') as view:
+            size = len(view)
+            offset = 0
+            
+            # Дополняем хвост предыдущего вызова до полного блока
+            if self.buffer:
+                need = 64 - len(self.buffer)
+                if size < need:
+                    self.buffer.extend(view)
+                    return
+                self.buffer.extend(view[:need])
+                self._process_blocks(self.buffer, 0, 64)
+                self.buffer.clear()
+                offset = need
+            
+            # Обрабатываем полные блоки по 64 байта прямо из входа
+            end = offset + (size - offset) // 64 * 64
+            if end > offset:
+                self._process_blocks(view, offset, end)
             
-            self._process_block(block)
+            # Сохраняем неполный хвост
+            if end < size:
+                self.buffer.extend(view[end:])
     
     
-    def _process_block(self, block: bytes) -> None:
+    def _process_blocks(self, data, start: int, end: int) -> None:
         """
-        Обрабатывает один полный блок (64 байта).
+        Обрабатывает подряд идущие полные блоки data[start:end].
         
-        Обновляет h, N, Σ согласно Этапу 2 стандарта.
+        Обновляет h, N, Σ согласно Этапу 2 стандарта. Внутри серии
+        h, N и сумма блоков живут в локальных переменных; Σ и N
+        приводятся по модулю 2^512 один раз на серию (N на серии
+        короче 2^503 байт переполниться не может).
         
         Args:
-            block: Полный блок сообщения (64 байта)
+            data: Буфер с блоками (bytes, bytearray или memoryview)
+            start: Смещение первого блока
+            end: Конец последнего блока (end - start кратно 64)
         """
-        assert len(block) == 64
+        assert (end - start) % 64 == 0
+        g = self._g
+        h = self.h
+        N = self.N
+        total = 0
         
-        # Применяем функцию сжатия: h := g_N(h, block)
-        self.h = g(self.N, self.h, block)
+        for offset in range(start, end, 64):
+            m = int.from_bytes(data[offset:offset + 64], 'big')
+            
+            # Применяем функцию сжатия: h := g_N(h, block)
+            h = g(N, h, m)
+            
+            # N := N ⊞ 512, сумма блоков для Σ
+            N += 512
+            total += m
         
-        # Обновляем счётчик: N := N ⊞ 512
-        block_bits = int_to_bytes(512, 64)
-        self.N = add_mod_2n_512(self.N, block_bits)
+        self.h = h
+        self.N = N & MASK_512
         
-        # Обновляем контрольную сумму: Σ := Σ ⊞ block
-        self.Sigma = add_mod_2n_512(self.Sigma, block)
+        # Σ := Σ ⊞ (сумма блоков серии)
+        self.Sigma = (self.Sigma + total) & MASK_512
     
     
-    def final(self) -> bytes:
-        if self._finalized:
-            raise RuntimeError("final() уже был вызван")
-        self._finalized = True
-
+    def digest(self) -> bytes:
+        """
+        Возвращает хэш данных, поданных на текущий момент.
+        
+        Финализация выполняется над локальной копией h, N, Σ, поэтому
+        состояние хэшера не меняется и update() можно вызывать дальше.
+        
+        Returns:
+            Хэш-код (32 или 64 байта)
+        """
         # 1) Подготовка последнего блока
         last_len_bits = len(self.buffer) * 8
-        last_block = pad_last_block(bytes(self.buffer))  # паддинг сообщения
+        # паддинг сообщения
+        last_block = bytes_to_int(pad_last_block(bytes(self.buffer)))
 
         # 2) g_N(h, m) ДОЛЖЕН использовать текущий N (до инкремента!)
-        self.h = g(self.N, self.h, last_block)
+        g = self._g
+        h = g(self.N, self.h, last_block)
 
         # 3) Обновить N и Σ ПОСЛЕ g_N, как в RFC
-        self.N = add_mod_2n_512(self.N, int_to_bytes(last_len_bits, 64))
-        self.Sigma = add_mod_2n_512(self.Sigma, last_block)
+        N = (self.N + last_len_bits) & MASK_512
+        Sigma = (self.Sigma + last_block) & MASK_512
 
         # 4) g_0(h, N) и g_0(h, Σ)
-        self.h = g(bytes(64), self.h, self.N)
-        self.h = g(bytes(64), self.h, self.Sigma)
+        h = g(0, h, N)
+        h = g(0, h, Sigma)
 
         # 5) Усечение для 256 бит
-        return self.h[:32] if self.out_bits == 256 else self.h
+        digest = int_to_bytes(h, 64)
+        return digest[:32] if self.out_bits == 256 else digest
+    
+    
+    def hexdigest(self) -> str:
+        """Хэш-код в виде шестнадцатеричной строки"""
+        return self.digest().hex()
+    
+    
+    def final(self) -> bytes:
+        """
+        Завершает хэширование и возвращает хэш.
+        
+        После final() хэшер закрыт для update(); digest() по-прежнему
+        возвращает тот же результат.
+        
+        Raises:
+            RuntimeError: Если final() уже был вызван
+        """
+        if self._finalized:
+            raise RuntimeError("final() уже был вызван")
+        self._finalized = True
+        return self.digest()
+    
+    
+    def copy(self) -> "Streebog":
+        """
+        Возвращает независимую копию хэшера.
+        
+        Копируется только компактное состояние: три 512-битных числа
+        и хвост буфера короче 64 байт. Удобно для общего префикса:
+        префикс хэшируется один раз, дальше — copy() на каждое сообщение.
+        """
+        clone = Streebog.__new__(Streebog)
+        clone.out_bits = self.out_bits
+        clone._g = self._g
+        clone.h = self.h
+        clone.N = self.N
+        clone.Sigma = self.Sigma
+        clone.buffer = bytearray(self.buffer)
+        clone._finalized = self._finalized
+        return clone
+    
+    
+    @property
+    def message_length(self) -> int:
+        """
+        Число байт, поданных в хэшер (по модулю 2^509).
+        
+        Это смещение в потоке, с которого нужно продолжить после
+        восстановления из state_bytes().
+        """
+        return self.N // 8 + len(self.buffer)
+    
+    
+    def state_bytes(self) -> bytes:
+        """
+        Экспортирует состояние хэшера в компактный версионированный формат.
+        
+        Формат (big-endian): магия b"STRB", версия (1 байт), out_bits
+        (2 байта), длина хвоста (1 байт), h, N, Σ (по 64 байта), хвост
+        буфера (0-63 байта). Итого не больше 263 байт.
+        
+        Returns:
+            Состояние для Streebog.from_state()
+            
+        Raises:
+            RuntimeError: Если вызвано после final()
+        """
+        if self._finalized:
+            raise RuntimeError("Нельзя экспортировать состояние после final()")
+        
+        return b"".join((
+            _STATE_HEADER.pack(STATE_MAGIC, STATE_VERSION, self.out_bits,
+                               len(self.buffer)),
+            int_to_bytes(self.h, 64),
+            int_to_bytes(self.N, 64),
+            int_to_bytes(self.Sigma, 64),
+            bytes(self.buffer),
+        ))
+    
+    
+    @classmethod
+    def from_state(cls, state: bytes) -> "Streebog":
+        """
+        Восстанавливает хэшер из state_bytes().
+        
+        Args:
+            state: Экспортированное состояние
+            
+        Returns:
+            Хэшер, продолжающий цепочку с того же места
+            
+        Raises:
+            ValueError: Если формат или версия состояния не распознаны
+        """
+        state = bytes(state)
+        header_size = _STATE_HEADER.size
+        if len(state) < header_size + 192:
+            raise ValueError("Состояние слишком короткое")
+        
+        magic, version, out_bits, tail_len = _STATE_HEADER.unpack_from(state)
+        if magic != STATE_MAGIC:
+            raise ValueError("Это не состояние Streebog")
+        if version != STATE_VERSION:
+            raise ValueError(f"Неподдерживаемая версия состояния: {version}")
+        if tail_len >= 64 or len(state) != header_size + 192 + tail_len:
+            raise ValueError("Неверная длина состояния")
+        
+        hasher = cls(out_bits)
+        offset = header_size
+        hasher.h = bytes_to_int(state[offset:offset + 64])
+        hasher.N = bytes_to_int(state[offset + 64:offset + 128])
+        hasher.Sigma = bytes_to_int(state[offset + 128:offset + 192])
+        hasher.buffer = bytearray(state[offset + 192:])
+        return hasher
 
 # ============================================================================
 # ФУНКЦИИ-ОБЁРТКИ
 # ============================================================================
 
+def streebog256(data=None) -> Streebog:
+    """Конструктор в стиле hashlib.sha256: Streebog(256, data)"""
+    return Streebog(256, data)
+
+
+def streebog512(data=None) -> Streebog:
+    """Конструктор в стиле hashlib.sha512: Streebog(512, data)"""
+    return Streebog(512, data)
+
+
+def _hash_short(message: bytes, out_bits: int) -> Optional[bytes]:
+    """
+    Хэш сообщения короче 64 байт на коротком пути реализации
+    (Backend.hash_short) или None, если его у реализации нет.
+    """
+    hash_short = get_backend().hash_short
+    if hash_short is None:
+        return None
+    return hash_short(message, out_bits)
+
+
 def hash_512(message: bytes) -> bytes:
     """
     Вычисляет 512-битный хэш сообщения (one-shot).
@@ -157,6 +391,10 @@ def hash_512(message: bytes) -> bytes:
         >>> hash_512(b"").hex()
         '...'  # известный тест-вектор для пустой строки
     """
+    if isinstance(message, (bytes, bytearray)) and len(message) < 64:
+        digest = _hash_short(message, 512)
+        if digest is not None:
+            return digest
     hasher = Streebog(512)
     hasher.update(message)
     return hasher.final()
@@ -176,11 +414,135 @@ def hash_256(message: bytes) -> bytes:
         >>> hash_256(b"").hex()
         '...'  # известный тест-вектор для пустой строки
     """
+    if isinstance(message, (bytes, bytearray)) and len(message) < 64:
+        digest = _hash_short(message, 256)
+        if digest is not None:
+            return digest
     hasher = Streebog(256)
     hasher.update(message)
     return hasher.final()
 
 
+# ============================================================================
+# ФАЙЛЫ
+# ============================================================================
+
+def update_from_fd(hasher: Streebog, fd: int, start: int, end: int) -> None:
+    """
+    Подаёт в хэшер байты [start, end) обычного файла окнами mmap.
+
+    Окна выровнены по MMAP_WINDOW, поэтому в памяти одновременно
+    отображено не больше одного окна. Если файловая система не
+    поддерживает mmap (sysfs, часть FUSE и сетевых), остаток читается
+    через _update_from_range. Диапазон должен лежать внутри файла,
+    а файл не должен усекаться во время вызова (см. hash_fd).
+
+    Args:
+        hasher: Хэшер, в который добавляются байты
+        fd: Открытый на чтение дескриптор обычного файла
+        start: Смещение первого байта
+        end: Смещение за последним байтом (не больше размера файла)
+    """
+    offset = start - start % MMAP_WINDOW
+    while offset < end:
+        length = min(MMAP_WINDOW, end - offset)
+        try:
+            mm = mmap.mmap(fd, length, access=mmap.ACCESS_READ, offset=offset)
+        except (OSError, ValueError):
+            _update_from_range(hasher, fd, max(start, offset), end)
+            return
+        with mm:
+            if hasattr(mm, 'madvise'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            with memoryview(mm) as view:
+                hasher.update(view[max(start - offset, 0):])
+        offset += length
+
+
+def _update_from_range(hasher: Streebog, fd: int, start: int, end: int) -> None:
+    """
+    Подаёт в хэшер байты [start, end) файла чтением (меньше, если
+    файл кончается раньше). Позиция fd после вызова не определена.
+    """
+    remaining = end - start
+    if remaining <= 0:
+        return
+    os.lseek(fd, start, os.SEEK_SET)
+    buffer = bytearray(min(READ_BUFFER_SIZE, remaining))
+    with io.FileIO(fd, 'rb', closefd=False) as f, memoryview(buffer) as view:
+        while remaining > 0:
+            n = f.readinto(view[:min(remaining, len(buffer))])
+            if not n:
+                break
+            hasher.update(view[:n])
+            remaining -= n
+
+
+def _update_from_reads(hasher: Streebog, fd: int) -> None:
+    """Подаёт в хэшер всё, что читается из fd, через один переиспользуемый буфер"""
+    buffer = bytearray(READ_BUFFER_SIZE)
+    with io.FileIO(fd, 'rb', closefd=False) as f, memoryview(buffer) as view:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            hasher.update(view[:n])
+
+
+def hash_fd(fd: int, out_bits: int = 512) -> bytes:
+    """
+    Вычисляет хэш данных из файлового дескриптора (от текущей позиции до конца).
+    
+    Обычные файлы отображаются в память окнами фиксированного размера
+    (на файловых системах без mmap — читаются), каналы и сокеты
+    читаются через readinto в переиспользуемый буфер.
+    Пиковое потребление памяти не зависит от размера файла.
+    Дескриптор не закрывается; позиция после вызова — в конце данных.
+
+    Файл не должен усекаться во время хэширования: обращение
+    к отображённой странице за новым концом файла завершает процесс
+    сигналом SIGBUS, который Python не перехватывает. Дописывание
+    в конец безопасно — остаток дочитывается обычным чтением.
+    
+    Args:
+        fd: Открытый на чтение файловый дескриптор
+        out_bits: Длина выходного хэша (256 или 512 бит)
+        
+    Returns:
+        Хэш-код (32 или 64 байта)
+    """
+    hasher = Streebog(out_bits)
+    
+    info = os.fstat(fd)
+    if stat.S_ISREG(info.st_mode) and info.st_size > 0:
+        start = os.lseek(fd, 0, os.SEEK_CUR)
+        update_from_fd(hasher, fd, start, info.st_size)
+        os.lseek(fd, info.st_size, os.SEEK_SET)
+        # Файл мог вырасти после fstat — дочитываем остаток
+        _update_from_reads(hasher, fd)
+    else:
+        _update_from_reads(hasher, fd)
+    
+    return hasher.final()
+
+
+def hash_file(path: Union[str, bytes, os.PathLike], out_bits: int = 512) -> bytes:
+    """
+    Вычисляет хэш файла, не загружая его в память целиком.
+    
+    Args:
+        path: Путь к файлу
+        out_bits: Длина выходного хэша (256 или 512 бит)
+        
+    Returns:
+        Хэш-код (32 или 64 байта)
+        
+    Raises:
+        OSError: Если файл не удалось открыть или прочитать
+    """
+    with open(path, 'rb', buffering=0) as f:
+        return hash_fd(f.fileno(), out_bits)
+
 # ============================================================================
 # ТЕСТОВЫЕ ВЕКТОРЫ
 # ============================================================================
@@ -272,4 +634,8 @@ def _self_check() -> None:
 
 
 if __name__ == "__main__":
-    _self_check()
+    # python -m streebog — утилита командной строки (см. cli.py);
+    # самопроверка: python -m streebog --self-test
+    import sys
+    from cli import main
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+tables.py - Табличная реализация преобразования LPS для ГОСТ 34.11-2018
+
+Преобразование L ∘ P ∘ S линейно по каждому входному байту после
+подстановки π, поэтому его можно свести к восьми таблицам по 256
+64-битных слов:
+
+    LPS(a)_j = T_0[a_j] ⊕ T_1[a_{8+j}] ⊕ ... ⊕ T_7[a_{56+j}]
+
+где T_k[x] = l(π(x) в позиции байта k), а индексы a_{8k+j} — это
+перестановка τ, записанная в явном виде (τ(8j+k) = 8k+j).
+
+Итого полный LPS — 64 обращения к таблицам и XOR'ы вместо
+побитового прохода по матрице A.
+
+Таблицы сгенерированы заранее в lps_tables.bin (python tables.py
+--generate) и при импорте только читаются в array('Q'). Файл хранит
+CRC32 констант, из которых построен, и CRC32 самих таблиц; если он
+отсутствует, устарел или повреждён, таблицы строятся заново, как
+раньше.
+"""
+
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import Optional
+
+from constants import A_MATRIX, PI, TAU
+
+
+# Файл с предвычисленными таблицами: заголовок (магия, CRC32 констант,
+# CRC32 таблиц), затем 8·256 слов big-endian
+TABLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lps_tables.bin")
+_BLOB_MAGIC = b"LPST"
+_BLOB_HEADER = struct.Struct('>4sII')
+_BLOB_PAYLOAD_SIZE = 8 * 256 * 8
+
+
+# ============================================================================
+# ПОСТРОЕНИЕ ТАБЛИЦ
+# ============================================================================
+
+def build_lps_tables() -> tuple[tuple[int, ...], ...]:
+    """
+    Строит восемь таблиц T_0...T_7 для быстрого LPS.
+
+    T_k[x] — результат l() для 8-байтового слова, у которого в байте k
+    стоит π(x), а остальные байты нулевые (big-endian, как в primitives.l).
+
+    Returns:
+        Кортеж из 8 кортежей по 256 целых чисел (64 бита)
+    """
+    rows = [int.from_bytes(row, byteorder='big') for row in A_MATRIX]
+
+    tables = []
+    for k in range(8):
+        table = []
+        for x in range(256):
+            value = PI[x]
+            word = 0
+            # Бит (7 - bit) байта k соответствует строке A[8k + bit]
+            for bit in range(8):
+                if value & (1 << (7 - bit)):
+                    word ^= rows[8 * k + bit]
+            table.append(word)
+        tables.append(tuple(table))
+
+    return tuple(tables)
+
+
+def _constants_crc() -> int:
+    """CRC32 констант, от которых зависят таблицы"""
+    return zlib.crc32(b"".join(A_MATRIX) + bytes(PI) + bytes(TAU))
+
+
+def write_tables(path: str = TABLES_PATH) -> None:
+    """Генерирует файл предвычисленных таблиц"""
+    words = array('Q', [word for table in build_lps_tables() for word in table])
+    if sys.byteorder == 'little':
+        words.byteswap()
+    payload = words.tobytes()
+    with open(path, 'wb') as f:
+        f.write(_BLOB_HEADER.pack(_BLOB_MAGIC, _constants_crc(),
+                                  zlib.crc32(payload)))
+        f.write(payload)
+
+
+def _read_blob(path: str) -> Optional[tuple[tuple[int, ...], ...]]:
+    """Таблицы из файла или None, если файла нет, он устарел или повреждён"""
+    try:
+        with open(path, 'rb') as f:
+            blob = f.read()
+    except OSError:
+        return None
+
+    if len(blob) != _BLOB_HEADER.size + _BLOB_PAYLOAD_SIZE:
+        return None
+    payload = blob[_BLOB_HEADER.size:]
+    expected = (_BLOB_MAGIC, _constants_crc(), zlib.crc32(payload))
+    if _BLOB_HEADER.unpack_from(blob) != expected:
+        return None
+
+    words = array('Q')
+    words.frombytes(payload)
+    if sys.byteorder == 'little':
+        words.byteswap()
+    return tuple(tuple(words[256 * k:256 * (k + 1)]) for k in range(8))
+
+
+def load_lps_tables(path: str = TABLES_PATH) -> tuple[tuple[int, ...], ...]:
+    """
+    Читает таблицы из файла, а если он отсутствует, устарел или
+    повреждён — строит.
+
+    Returns:
+        Кортеж из 8 кортежей по 256 целых чисел (как build_lps_tables)
+    """
+    tables = _read_blob(path)
+    return tables if tables is not None else build_lps_tables()
+
+
+LPS_TABLES = load_lps_tables()
+
+# Явная форма перестановки τ, на которую опираются индексы в LPS_table
+assert all(TAU[8 * j + k] == 8 * k + j for j in range(8) for k in range(8))
+
+
+# ============================================================================
+# ТАБЛИЧНЫЙ LPS
+# ============================================================================
+
+def LPS_table(a: bytes) -> bytes:
+    """
+    Композиция L ∘ P ∘ S через предвычисленные таблицы.
+
+    Побитово совпадает с primitives.LPS.
+
+    Args:
+        a: 64 байта входных данных
+
+    Returns:
+        64 байта выходных данных
+    """
+    assert len(a) == 64, f"LPS_table требует 64 байта, получено {len(a)}"
+
+    T0, T1, T2, T3, T4, T5, T6, T7 = LPS_TABLES
+
+    result = 0
+    for j in range(8):
+        word = (T0[a[j]] ^ T1[a[8 + j]] ^ T2[a[16 + j]] ^ T3[a[24 + j]] ^
+                T4[a[32 + j]] ^ T5[a[40 + j]] ^ T6[a[48 + j]] ^ T7[a[56 + j]])
+        result = (result << 64) | word
+
+    return result.to_bytes(64, byteorder='big')
+
+
+# ============================================================================
+# САМОТЕСТИРОВАНИЕ
+# ============================================================================
+
+def _self_check() -> None:
+    """Сверка табличного LPS с эталонными примитивами"""
+    import os
+    from primitives import LPS
+
+    # Пример из RFC 6986: LPS(0^512) = (b383fc2eced4a574)^8
+    assert LPS_table(bytes(64)) == bytes.fromhex("b383fc2eced4a574") * 8
+
+    for _ in range(32):
+        a = os.urandom(64)
+        assert LPS_table(a) == LPS(a), "LPS_table расходится с LPS"
+
+    print("✓ Табличный LPS совпадает с эталонным")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--generate"]:
+        write_tables()
+        print(f"✓ Таблицы записаны в {TABLES_PATH}")
+    else:
+        _self_check()
@@ -0,0 +1,75 @@
+"""
+Тесты асинхронного хэширования (async_streebog.py)
+"""
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from async_streebog import AsyncStreebog, hash_stream
+from streebog import hash_256, hash_512
+
+
+DATA = bytes(range(256)) * 40
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_budgeted_update_yields_to_loop():
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        await asyncio.sleep(0)
+        hasher = AsyncStreebog(256, blocks_per_yield=4)
+        await hasher.update(DATA)
+        task.cancel()
+        return hasher.digest(), ticks
+
+    digest, ticks = _run(main())
+    assert digest == hash_256(DATA)
+    assert ticks >= len(DATA) // (4 * 64) - 1
+
+
+def test_stream_reader_and_async_iterator():
+    async def main():
+        reader = asyncio.StreamReader()
+        reader.feed_data(DATA)
+        reader.feed_eof()
+        from_reader = await hash_stream(reader, 512, chunk_size=1000)
+
+        async def chunks():
+            for i in range(0, len(DATA), 333):
+                yield DATA[i:i + 333]
+
+        from_iter = await hash_stream(chunks(), 256)
+        return from_reader, from_iter
+
+    from_reader, from_iter = _run(main())
+    assert from_reader == hash_512(DATA)
+    assert from_iter == hash_256(DATA)
+
+
+@pytest.mark.parametrize("executor_cls", [ThreadPoolExecutor, ProcessPoolExecutor])
+def test_executor_offload(executor_cls):
+    async def main(executor):
+        hasher = AsyncStreebog(512, executor=executor)
+        await asyncio.gather(hasher.update(DATA[:1000]))
+        await hasher.update(DATA[1000:])
+        copy = hasher.copy()
+        await copy.update(b"extra")
+        return hasher.digest(), copy.digest()
+
+    with executor_cls(max_workers=1) as executor:
+        digest, extra = _run(main(executor))
+    assert digest == hash_512(DATA)
+    assert extra == hash_512(DATA + b"extra")
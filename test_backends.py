@@ -0,0 +1,137 @@
+"""
+Тесты реестра реализаций функции сжатия (backends.py)
+"""
+
+import os
+import threading
+
+import pytest
+
+import backends
+import int_compression
+from backends import Backend, available_backends, get_backend, hash_with, set_backend
+from batch import hash_256_batch
+from int_compression import g_int
+from streebog import TEST_VECTORS_512, Streebog, hash_256, hash_512
+
+
+@pytest.fixture(autouse=True)
+def restore_selection(monkeypatch):
+    monkeypatch.delenv(backends.ENV_VAR, raising=False)
+    monkeypatch.setattr(backends, "_override", None)
+    monkeypatch.setattr(backends, "_active", None)
+    monkeypatch.setattr(backends, "_active_batch", None)
+    monkeypatch.setattr(backends, "_LOADERS", dict(backends._LOADERS))
+
+
+def test_all_backends_agree():
+    message = os.urandom(150)
+    expected = hash_with(g_int, message, 512)
+    names = available_backends()
+    assert {"reference", "table", "int"} <= set(names)
+    for name in names:
+        assert hash_with(backends.load_backend(name).g, message, 512) == expected
+
+
+def test_test_vector_m1_on_every_backend():
+    message, expected = next(iter(TEST_VECTORS_512.items()))
+    for name in available_backends():
+        set_backend(name)
+        assert hash_512(message) == expected
+
+
+def test_override_applies_to_new_hashers():
+    table = set_backend("table")
+    assert Streebog(256)._g is table.g
+    assert hash_256(b"abc" * 50) == hash_with(g_int, b"abc" * 50, 256)
+
+    set_backend(None)
+    assert get_backend().name == "int"
+
+
+def test_environment_variable(monkeypatch):
+    monkeypatch.setenv(backends.ENV_VAR, "reference")
+    assert get_backend().name == "reference"
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        set_backend("no-such-engine")
+
+
+def test_broken_backend_is_rejected():
+    backends.register_backend("broken",
+                              lambda: Backend("broken", lambda N, h, m: h ^ m))
+    with pytest.raises(RuntimeError):
+        set_backend("broken")
+    assert "broken" not in available_backends()
+
+
+def test_failure_names_backend_and_vector():
+    def g_broken_after_first_block(N, h, m):
+        return g_int(N, h, m) ^ (N == 512)
+
+    backends.register_backend("broken-m2", lambda: Backend(
+        "broken-m2", g_broken_after_first_block))
+    with pytest.raises(RuntimeError, match="'broken-m2'.*M2"):
+        set_backend("broken-m2")
+
+
+def test_reference_is_not_checked_against_other_backends(monkeypatch):
+    monkeypatch.setattr(int_compression, "g_int", lambda N, h, m: h ^ m)
+    monkeypatch.setattr(backends, "_loaded", {})
+    monkeypatch.setattr(backends, "_reference_answers", {})
+    assert set_backend("reference").name == "reference"
+    with pytest.raises(RuntimeError, match="'int'"):
+        set_backend("int")
+
+
+def test_broken_short_path_is_rejected():
+    def broken_short(message, out_bits):
+        return bytes(out_bits // 8)
+
+    backends.register_backend("broken-short", lambda: Backend(
+        "broken-short", g_int, hash_short=broken_short))
+    with pytest.raises(RuntimeError):
+        set_backend("broken-short")
+
+
+def test_short_messages_without_short_path():
+    set_backend("table")
+    assert get_backend().hash_short is None
+    assert hash_256(b"abc") == hash_with(g_int, b"abc", 256)
+
+
+def test_batch_prefers_numpy_only_when_auto():
+    expected = "numpy" if "numpy" in available_backends() else "int"
+    assert backends.get_batch_backend().name == expected
+    set_backend("table")
+    assert backends.get_batch_backend().name == "table"
+
+
+def test_batch_falls_back_to_serial():
+    messages = [b"", b"x" * 63, b"y" * 64, b"z" * 200]
+    set_backend("int")
+    assert hash_256_batch(messages) == [hash_256(m) for m in messages]
+
+
+def test_concurrent_first_use_loads_once():
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return Backend("counted", g_int)
+
+    backends.register_backend("counted", loader)
+    barrier = threading.Barrier(8)
+
+    def work():
+        barrier.wait()
+        backends.load_backend("counted")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert loads == [1]
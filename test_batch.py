@@ -0,0 +1,61 @@
+"""
+Тесты пакетного хэширования на NumPy (batch.py)
+"""
+
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from batch import _hash_batch, hash_256_batch, hash_512_batch  # noqa: E402
+from streebog import TEST_VECTORS_256, hash_256, hash_512  # noqa: E402
+
+
+def _messages():
+    rng = random.Random(7)
+    lengths = [0, 1, 31, 32, 63, 64, 65, 100, 127, 128, 129, 200, 64, 0]
+    return [bytes(rng.getrandbits(8) for _ in range(n)) for n in lengths]
+
+
+def test_batch_512_matches_streaming():
+    messages = _messages()
+    assert hash_512_batch(messages) == [hash_512(m) for m in messages]
+
+
+def test_batch_256_matches_streaming():
+    messages = _messages()
+    assert hash_256_batch(messages) == [hash_256(m) for m in messages]
+
+
+def test_small_lane_chunks_keep_order():
+    messages = _messages()
+    assert hash_256_batch(messages, max_lanes=3) == [hash_256(m) for m in messages]
+
+
+def test_test_vector_m1():
+    message, expected = next(iter(TEST_VECTORS_256.items()))
+    assert hash_256_batch([message]) == [expected]
+
+
+def test_empty_batch():
+    assert hash_512_batch([]) == []
+
+
+@pytest.mark.parametrize("max_lanes", [0, -1])
+def test_invalid_max_lanes(max_lanes):
+    with pytest.raises(ValueError):
+        hash_256_batch([b"abc"], max_lanes=max_lanes)
+
+
+def test_invalid_out_bits():
+    with pytest.raises(ValueError):
+        _hash_batch([b"abc"], 384)
+
+
+def test_shared_arrays_are_read_only():
+    import batch
+
+    for array in (batch._TABLES_FLAT, batch._TABLE_OFFSETS, *batch._C_WORDS):
+        with pytest.raises(ValueError):
+            array[0] = 0
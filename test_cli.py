@@ -0,0 +1,105 @@
+"""
+Тесты командной строки (cli.py)
+"""
+
+from cli import format_line, main
+from streebog import hash_256, hash_512
+
+
+def _write(tmp_path, files):
+    paths = []
+    for name, data in files:
+        path = tmp_path / name
+        path.write_bytes(data)
+        paths.append(str(path))
+    return paths
+
+
+def test_format_line():
+    digest = bytes(range(32))
+    assert format_line(digest, "a.txt", 256) == f"{digest.hex()}  a.txt"
+    assert format_line(digest, "a.txt", 256, binary=True) == f"{digest.hex()} *a.txt"
+    assert format_line(digest, "a.txt", 256, tag=True) == \
+        f"STREEBOG256 (a.txt) = {digest.hex()}"
+    assert format_line(digest, "a\nb", 256) == f"\\{digest.hex()}  a\\nb"
+
+
+def test_prog_name_selects_length(tmp_path, capsys):
+    (path,) = _write(tmp_path, [("x", b"hello")])
+    assert main([path], prog="streebog256sum") == 0
+    assert capsys.readouterr().out == f"{hash_256(b'hello').hex()}  {path}\n"
+    assert main([path], prog="streebog512sum") == 0
+    assert capsys.readouterr().out == f"{hash_512(b'hello').hex()}  {path}\n"
+
+
+def test_missing_file_sets_status(tmp_path, capsys):
+    (path,) = _write(tmp_path, [("x", b"data")])
+    missing = str(tmp_path / "missing")
+    assert main(["-l", "256", missing, path], prog="streebog") == 1
+    captured = capsys.readouterr()
+    assert captured.out == f"{hash_256(b'data').hex()}  {path}\n"
+    assert missing in captured.err
+
+
+def test_parallel_output_order(tmp_path, capsys):
+    files = [(f"f{i}", bytes([i]) * (i * 500)) for i in range(12)]
+    paths = _write(tmp_path, files)
+    missing = str(tmp_path / "missing")
+    argv = ["-j", "3", "-l", "256", *paths[:6], missing, *paths[6:]]
+    assert main(argv, prog="streebog") == 1
+
+    expected = [f"{hash_256(data).hex()}  {path}"
+                for (_, data), path in zip(files, paths)]
+    assert capsys.readouterr().out.splitlines() == expected
+
+
+def test_parse_manifest_line():
+    from cli import parse_manifest_line
+    digest = bytes(range(32))
+    entry = parse_manifest_line(f"{digest.hex()}  a b.txt")
+    assert (entry.name, entry.digest, entry.size) == ("a b.txt", digest, None)
+    entry = parse_manifest_line(f"{digest.hex()}  12  a.txt", with_size=True)
+    assert (entry.name, entry.size) == ("a.txt", 12)
+    assert parse_manifest_line(f"STREEBOG256 (x) = {digest.hex()}").name == "x"
+    assert parse_manifest_line(f"\\{digest.hex()}  a\\nb").name == "a\nb"
+    assert parse_manifest_line("garbage") is None
+    assert parse_manifest_line(f"{digest.hex()[:-2]}  a") is None
+
+
+def _manifest(tmp_path, capsys, argv):
+    assert main(argv, prog="streebog") == 0
+    manifest = tmp_path / "manifest"
+    manifest.write_text(capsys.readouterr().out)
+    return str(manifest)
+
+
+def test_check_ok_and_mismatch(tmp_path, capsys, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _write(tmp_path, [("a", b"one"), ("b", b"two"), ("c", b"three")])
+    manifest = _manifest(tmp_path, capsys, ["-l", "256", "a", "b", "c"])
+
+    assert main(["-c", "-j", "2", manifest], prog="streebog") == 0
+    assert capsys.readouterr().out == "a: OK\nb: OK\nc: OK\n"
+
+    (tmp_path / "b").write_bytes(b"TWO")
+    assert main(["-c", manifest], prog="streebog") == 1
+    captured = capsys.readouterr()
+    assert captured.out == "a: OK\nb: FAILED\nc: OK\n"
+    assert "did NOT match" in captured.err
+
+
+def test_check_size_mismatch_skips_hashing(tmp_path, capsys, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _write(tmp_path, [("a", b"one"), ("b", b"two")])
+    manifest = _manifest(tmp_path, capsys, ["--size", "a", "b"])
+    (tmp_path / "a").write_bytes(b"longer")
+
+    hashed = []
+    import parallel
+    original = parallel.file_result
+    monkeypatch.setattr("cli.file_result",
+                        lambda path, bits: hashed.append(path) or original(path, bits))
+
+    assert main(["-c", "--size", "--fail-fast", manifest], prog="streebog") == 1
+    assert capsys.readouterr().out.startswith("a: FAILED (")
+    assert hashed == []
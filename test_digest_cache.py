@@ -0,0 +1,136 @@
+"""
+Тесты кэша хэшей файлов (digest_cache.py)
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import digest_cache
+import parallel
+from cli import main
+from digest_cache import DigestCache
+from streebog import hash_256, hash_512
+
+
+def _write_old(path, data: bytes, age: float = 60.0):
+    """Файл с mtime в прошлом (вне окна RACY_SECONDS)"""
+    path.write_bytes(data)
+    past = time.time() - age
+    os.utime(path, (past, past))
+    return path
+
+
+def _no_reads(*args):
+    raise AssertionError("файл не должен читаться")
+
+
+def _cached_digest(args):
+    db, path = args
+    with DigestCache(db) as cache:
+        digest = cache.hash_file(path, 256)
+        return digest, cache.hits
+
+
+def test_hit_does_not_read_file(tmp_path, monkeypatch):
+    path = _write_old(tmp_path / "a", b"abc" * 100)
+    with DigestCache(tmp_path / "cache.sqlite") as cache:
+        assert cache.hash_file(path, 256) == hash_256(b"abc" * 100)
+        monkeypatch.setattr(digest_cache, "hash_file", _no_reads)
+        assert cache.hash_file(path, 256) == hash_256(b"abc" * 100)
+        assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_entries_persist_and_are_per_length(tmp_path, monkeypatch):
+    path = _write_old(tmp_path / "a", b"x" * 1000)
+    db = tmp_path / "cache.sqlite"
+    with DigestCache(db) as cache:
+        cache.hash_file(path, 256)
+        cache.hash_file(path, 512)
+
+    monkeypatch.setattr(digest_cache, "hash_file", _no_reads)
+    with DigestCache(db) as cache:
+        assert len(cache) == 2
+        assert cache.hash_file(path, 256) == hash_256(b"x" * 1000)
+        assert cache.hash_file(path, 512) == hash_512(b"x" * 1000)
+
+
+def test_same_size_rewrite_with_restored_mtime_is_detected(tmp_path):
+    path = _write_old(tmp_path / "a", b"A" * 500)
+    mtime_ns = os.stat(path).st_mtime_ns
+    with DigestCache(tmp_path / "cache.sqlite") as cache:
+        cache.hash_file(path, 256)
+        path.write_bytes(b"B" * 500)
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+        # mtime и размер прежние, но ctime изменился
+        assert cache.hash_file(path, 256) == hash_256(b"B" * 500)
+        assert cache.misses == 2
+
+
+def test_recent_files_are_not_stored(tmp_path):
+    path = tmp_path / "fresh"
+    path.write_bytes(b"new")
+    with DigestCache(tmp_path / "cache.sqlite") as cache:
+        cache.hash_file(path, 256)
+        cache.hash_file(path, 256)
+        assert cache.hits == 0
+        assert len(cache) == 0
+
+
+def test_prune_by_count_and_age(tmp_path):
+    paths = [_write_old(tmp_path / f"f{i}", bytes([i]) * 10) for i in range(5)]
+    with DigestCache(tmp_path / "cache.sqlite", max_entries=None) as cache:
+        for path in paths:
+            cache.hash_file(path, 256)
+        cache.flush()
+        # f0 и f1 использовались давно
+        cache._db.execute("UPDATE digests SET used = used - 7200")
+        for path in paths[2:]:
+            cache.hash_file(path, 256)
+
+        assert cache.prune(max_entries=4) == 1
+        assert cache.prune(max_age=3600) == 1
+        assert len(cache) == 3
+        cache.hash_file(paths[0], 256)
+        assert cache.hits == 3
+
+
+def test_concurrent_processes(tmp_path):
+    paths = [str(_write_old(tmp_path / f"f{i}", bytes([i]) * 2000)) for i in range(6)]
+    db = str(tmp_path / "cache.sqlite")
+    with DigestCache(db) as cache:
+        for path in paths[:3]:
+            cache.hash_file(path, 256)
+
+    with ProcessPoolExecutor(max_workers=3) as pool:
+        results = list(pool.map(_cached_digest, [(db, p) for p in paths * 2]))
+
+    assert [digest for digest, _ in results] == \
+        [hash_256(bytes([i]) * 2000) for i in range(6)] * 2
+    assert all(hits == 1 for _, hits in results[:3])
+    with DigestCache(db) as cache:
+        assert len(cache) == 6
+
+
+def test_cli_cache(tmp_path, capsys, monkeypatch):
+    paths = [str(_write_old(tmp_path / f"f{i}", bytes([i]) * 300)) for i in range(3)]
+    argv = ["-l", "256", "--cache", str(tmp_path / "cache.sqlite")] + paths
+    assert main(argv, prog="streebog") == 0
+    first = capsys.readouterr().out
+
+    monkeypatch.setattr(parallel, "hash_file", _no_reads)
+    assert main(argv, prog="streebog") == 0
+    assert capsys.readouterr().out == first
+
+    manifest = tmp_path / "MANIFEST"
+    manifest.write_text(first)
+    assert main(["-c", "--cache", str(tmp_path / "cache.sqlite"), str(manifest)],
+                prog="streebog") == 0
+
+
+def test_missing_file(tmp_path):
+    with DigestCache(tmp_path / "cache.sqlite") as cache:
+        with pytest.raises(OSError):
+            cache.hash_file(tmp_path / "missing", 256)
@@ -0,0 +1,96 @@
+"""
+Тесты файлового API (streebog.hash_file / hash_fd)
+"""
+
+import mmap
+import os
+import random
+import threading
+
+import pytest
+
+import streebog
+from streebog import hash_256, hash_512, hash_fd, hash_file
+
+
+def _data(size):
+    rng = random.Random(size)
+    return bytes(rng.getrandbits(8) for _ in range(size))
+
+
+def test_regular_file(tmp_path):
+    data = _data(5000)
+    path = tmp_path / "data.bin"
+    path.write_bytes(data)
+    assert hash_file(path) == hash_512(data)
+    assert hash_file(str(path), 256) == hash_256(data)
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty"
+    path.write_bytes(b"")
+    assert hash_file(path, 256) == hash_256(b"")
+
+
+def test_many_mmap_windows(tmp_path, monkeypatch):
+    monkeypatch.setattr(streebog, "MMAP_WINDOW", mmap.ALLOCATIONGRANULARITY)
+    data = _data(3 * mmap.ALLOCATIONGRANULARITY + 100)
+    path = tmp_path / "big.bin"
+    path.write_bytes(data)
+    assert hash_file(path) == hash_512(data)
+
+
+def test_fd_from_current_position(tmp_path, monkeypatch):
+    monkeypatch.setattr(streebog, "MMAP_WINDOW", mmap.ALLOCATIONGRANULARITY)
+    data = _data(2 * mmap.ALLOCATIONGRANULARITY + 10)
+    path = tmp_path / "data.bin"
+    path.write_bytes(data)
+    start = mmap.ALLOCATIONGRANULARITY + 3
+    with open(path, 'rb') as f:
+        f.seek(start)
+        assert hash_fd(f.fileno(), 256) == hash_256(data[start:])
+        assert f.tell() == len(data)
+
+
+def test_filesystem_without_mmap(tmp_path, monkeypatch):
+    def unsupported(*args, **kwargs):
+        raise OSError(19, "No such device")
+
+    monkeypatch.setattr(streebog.mmap, "mmap", unsupported)
+    monkeypatch.setattr(streebog, "READ_BUFFER_SIZE", 128)
+    data = _data(1000)
+    path = tmp_path / "data.bin"
+    path.write_bytes(data)
+    assert hash_file(path, 256) == hash_256(data)
+    with open(path, 'rb') as f:
+        f.seek(100)
+        assert hash_fd(f.fileno()) == hash_512(data[100:])
+        assert f.tell() == len(data)
+
+
+@pytest.mark.skipif(not os.path.exists("/sys/devices/system/cpu/online"),
+                    reason="нет sysfs")
+def test_sysfs_file():
+    path = "/sys/devices/system/cpu/online"
+    with open(path, 'rb') as f:
+        data = f.read()
+    assert hash_file(path, 256) == hash_256(data)
+
+
+def test_pipe(monkeypatch):
+    monkeypatch.setattr(streebog, "READ_BUFFER_SIZE", 128)
+    data = _data(1000)
+    r, w = os.pipe()
+
+    def writer():
+        for i in range(0, len(data), 77):
+            os.write(w, data[i:i + 77])
+        os.close(w)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        assert hash_fd(r) == hash_512(data)
+    finally:
+        thread.join()
+        os.close(r)
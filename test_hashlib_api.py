@@ -0,0 +1,52 @@
+"""
+Тесты hashlib-совместимого интерфейса Streebog
+"""
+
+import hmac
+
+import pytest
+
+from streebog import Streebog, hash_256, hash_512, streebog256, streebog512
+
+
+def test_attributes():
+    h = streebog256()
+    assert (h.name, h.digest_size, h.block_size) == ("streebog256", 32, 64)
+    h = streebog512(b"abc")
+    assert (h.name, h.digest_size, h.block_size) == ("streebog512", 64, 64)
+    assert h.digest() == hash_512(b"abc")
+
+
+def test_digest_is_non_destructive():
+    h = Streebog(256)
+    h.update(b"hello ")
+    assert h.digest() == hash_256(b"hello ")
+    assert h.hexdigest() == hash_256(b"hello ").hex()
+    h.update(b"world" * 30)
+    assert h.digest() == hash_256(b"hello " + b"world" * 30)
+
+
+def test_copy_shares_prefix():
+    prefix = b"P" * 4096 + b"tag"
+    base = Streebog(512, prefix)
+    first, second = base.copy(), base.copy()
+    first.update(b"one")
+    second.update(b"two")
+    assert first.digest() == hash_512(prefix + b"one")
+    assert second.digest() == hash_512(prefix + b"two")
+    assert base.digest() == hash_512(prefix)
+
+
+def test_final_closes_hasher():
+    h = Streebog(512, b"x")
+    assert h.final() == h.digest() == hash_512(b"x")
+    with pytest.raises(RuntimeError):
+        h.update(b"y")
+    with pytest.raises(RuntimeError):
+        h.final()
+
+
+def test_works_as_hmac_digestmod():
+    mac = hmac.new(b"key", b"message", digestmod=streebog256)
+    assert mac.digest_size == 32
+    assert len(mac.digest()) == 32
@@ -0,0 +1,88 @@
+"""
+Тесты инструментации (instrumentation.py)
+"""
+
+import os
+import stat
+
+import pytest
+
+import backends
+import compression
+import instrumentation
+from streebog import Streebog, hash_256, hash_512
+
+
+@pytest.fixture
+def stats():
+    instrumentation.reset()
+    instrumentation.enable()
+    yield instrumentation
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def test_disabled_leaves_hot_path_untouched():
+    update, digest, E = Streebog.update, Streebog.digest, compression.E
+    instrumentation.enable()
+    assert Streebog.update is not update
+    instrumentation.disable()
+    assert (Streebog.update, Streebog.digest, compression.E) == (update, digest, E)
+    assert not instrumentation.enabled()
+
+
+def test_counters(stats):
+    hasher = Streebog(256)
+    hasher.update(b"a" * 100)
+    hasher.update(b"b" * 100)
+    assert hasher.digest() == hash_256(b"a" * 100 + b"b" * 100)
+
+    snap = stats.snapshot()
+    # По 200 байт в двух хэшерах: 3 полных блока и дополненный в каждом
+    assert snap["bytes"] == 400
+    assert snap["blocks"] == 8
+    assert snap["g_calls"] == {"message": 8, "length": 2, "checksum": 2}
+    assert snap["seconds"]["update"] >= snap["seconds"]["compress"] > 0
+
+
+def test_table_backend_splits_stages(stats):
+    backends.set_backend("table")
+    try:
+        hash_512(b"x" * 64)
+    finally:
+        backends.set_backend(None)
+    seconds = stats.snapshot()["seconds"]
+    assert seconds["E"] >= seconds["key_schedule"] > 0
+
+
+def test_prometheus_export(stats, tmp_path):
+    hash_512(b"")
+    path = tmp_path / "streebog.prom"
+    stats.write_prometheus(str(path))
+    text = path.read_text()
+    assert "streebog_blocks_total 1\n" in text
+    assert 'streebog_g_calls_total{phase="checksum"} 1\n' in text
+    assert "# TYPE streebog_stage_seconds_total counter" in text
+    assert list(tmp_path.iterdir()) == [path]
+
+
+@pytest.mark.skipif(os.name == "nt", reason="права POSIX")
+def test_prometheus_file_is_world_readable(stats, tmp_path):
+    path = tmp_path / "streebog.prom"
+    stats.write_prometheus(str(path))
+    assert stat.S_IMODE(path.stat().st_mode) == 0o644
+
+
+def test_prometheus_omits_unmeasured_stages(stats):
+    backends.set_backend("int")
+    try:
+        hash_512(b"x" * 100)
+        text = stats.prometheus_text()
+        assert 'stage="compress"' in text
+        assert 'stage="E"' not in text and 'stage="key_schedule"' not in text
+
+        backends.set_backend("table")
+        hash_512(b"x" * 100)
+        assert 'stage="E"' in stats.prometheus_text()
+    finally:
+        backends.set_backend(None)
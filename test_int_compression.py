@@ -0,0 +1,95 @@
+"""
+Тесты целочисленного движка (int_compression.py) и Streebog на нём
+"""
+
+import random
+
+import pytest
+
+from compression import E, g, key_schedule
+from constants import IV_256, IV_512
+from int_compression import E_int, LPS_int, g_int, hash_short_int, key_schedule_int
+from streebog import Streebog, hash_256, hash_512
+from tables import LPS_table
+from utils import add_mod_2n_512, bytes_to_int, int_to_bytes, pad_last_block
+
+
+def _rand64(rng):
+    return bytes(rng.getrandbits(8) for _ in range(64))
+
+
+def _reference_hash(message: bytes, out_bits: int) -> bytes:
+    """Байтовая версия алгоритма поверх compression.g"""
+    h = IV_512 if out_bits == 512 else IV_256
+    N = Sigma = bytes(64)
+    while len(message) >= 64:
+        block, message = message[:64], message[64:]
+        h = g(N, h, block)
+        N = add_mod_2n_512(N, int_to_bytes(512, 64))
+        Sigma = add_mod_2n_512(Sigma, block)
+    last = pad_last_block(message)
+    h = g(N, h, last)
+    N = add_mod_2n_512(N, int_to_bytes(len(message) * 8, 64))
+    Sigma = add_mod_2n_512(Sigma, last)
+    h = g(bytes(64), h, N)
+    h = g(bytes(64), h, Sigma)
+    return h[:32] if out_bits == 256 else h
+
+
+def test_lps_int_matches_table():
+    rng = random.Random(1)
+    for _ in range(32):
+        a = _rand64(rng)
+        assert int_to_bytes(LPS_int(bytes_to_int(a)), 64) == LPS_table(a)
+
+
+def test_key_schedule_and_E():
+    rng = random.Random(2)
+    K0, m = _rand64(rng), _rand64(rng)
+    keys = key_schedule_int(bytes_to_int(K0))
+    assert [int_to_bytes(k, 64) for k in keys] == key_schedule(K0)
+    assert int_to_bytes(E_int(bytes_to_int(K0), bytes_to_int(m)), 64) == E(K0, m)
+
+
+def test_g_int_matches_g():
+    rng = random.Random(3)
+    for _ in range(8):
+        N, h, m = _rand64(rng), _rand64(rng), _rand64(rng)
+        result = g_int(bytes_to_int(N), bytes_to_int(h), bytes_to_int(m))
+        assert int_to_bytes(result, 64) == g(N, h, m)
+
+
+def test_hash_matches_bytes_reference():
+    rng = random.Random(4)
+    for length in (0, 1, 63, 64, 65, 127, 128, 200):
+        message = bytes(rng.getrandbits(8) for _ in range(length))
+        assert hash_512(message) == _reference_hash(message, 512)
+        assert hash_256(message) == _reference_hash(message, 256)
+
+
+def test_state_is_int():
+    hasher = Streebog(512)
+    hasher.update(b"A" * 130)
+    assert isinstance(hasher.h, int)
+    assert hasher.N == 1024
+    assert len(hasher.final()) == 64
+
+
+def test_short_path_matches_reference():
+    rng = random.Random(5)
+    for length in range(64):
+        message = bytes(rng.getrandbits(8) for _ in range(length))
+        for out_bits in (256, 512):
+            assert hash_short_int(message, out_bits) == \
+                _reference_hash(message, out_bits)
+
+
+def test_short_path_matches_streaming_object():
+    for message in (b"", b"a", bytearray(b"token-123"), b"x" * 63):
+        assert hash_256(message) == Streebog(256, message).digest()
+        assert hash_512(message) == Streebog(512, message).digest()
+
+
+def test_short_path_rejects_full_blocks():
+    with pytest.raises(ValueError):
+        hash_short_int(b"x" * 64, 256)
@@ -0,0 +1,186 @@
+"""
+Тесты индекса префиксов журнала (log_index.py)
+"""
+
+import os
+import threading
+
+import pytest
+
+import log_index
+from log_index import PrefixIndex
+from streebog import hash_256, hash_512
+
+INTERVAL = 256
+
+
+def _data(size: int) -> bytes:
+    return bytes((i * 7 + i // 256) & 0xff for i in range(size))
+
+
+def _log(tmp_path, data: bytes):
+    path = tmp_path / "audit.log"
+    path.write_bytes(data)
+    return path
+
+
+@pytest.fixture
+def hashed_ranges(monkeypatch):
+    """Записывает диапазоны журнала, поданные в хэшер"""
+    ranges = []
+    original = log_index.update_from_fd
+
+    def recording(hasher, fd, start, end):
+        ranges.append((start, end))
+        original(hasher, fd, start, end)
+
+    monkeypatch.setattr(log_index, "update_from_fd", recording)
+    return ranges
+
+
+def test_prefix_digests(tmp_path):
+    data = _data(3000)
+    index = PrefixIndex(_log(tmp_path, data), interval=INTERVAL)
+    assert index.update() == 3000 // INTERVAL
+    for offset in (0, 1, 63, 64, 255, 256, 257, 1024, 2999, 3000):
+        assert index.digest(offset) == hash_256(data[:offset])
+    assert index.digest() == hash_256(data)
+
+
+def test_512_bits(tmp_path):
+    data = _data(1000)
+    index = PrefixIndex(_log(tmp_path, data), interval=INTERVAL, out_bits=512)
+    index.update()
+    assert index.digest(700) == hash_512(data[:700])
+
+
+def test_lookup_hashes_at_most_one_interval(tmp_path, hashed_ranges):
+    index = PrefixIndex(_log(tmp_path, _data(5000)), interval=INTERVAL)
+    index.update()
+    hashed_ranges.clear()
+    index.digest(4000)
+    assert hashed_ranges == [(3840, 4000)]
+
+
+def test_append_processes_only_new_tail(tmp_path, hashed_ranges):
+    data = _data(4000)
+    path = _log(tmp_path, data[:1000])
+    index = PrefixIndex(path, interval=INTERVAL)
+    index.update()
+
+    with open(path, "ab") as f:
+        f.write(data[1000:])
+    hashed_ranges.clear()
+    assert index.update() == 4000 // INTERVAL - 1000 // INTERVAL
+    assert hashed_ranges[0][0] == 1000 // INTERVAL * INTERVAL
+    assert PrefixIndex(path).digest() == hash_256(data)
+
+
+def test_reopen_uses_stored_parameters(tmp_path):
+    path = _log(tmp_path, _data(600))
+    PrefixIndex(path, interval=128, out_bits=512).update()
+    index = PrefixIndex(path)
+    assert (index.interval, index.out_bits, index.checkpoints) == (128, 512, 4)
+    with pytest.raises(ValueError):
+        PrefixIndex(path, interval=256)
+
+
+def test_torn_record_is_ignored(tmp_path):
+    data = _data(2000)
+    path = _log(tmp_path, data)
+    index = PrefixIndex(path, interval=INTERVAL)
+    index.update()
+    count = index.checkpoints
+    with open(index.index_path, "r+b") as f:
+        f.truncate(os.path.getsize(index.index_path) - 10)
+    assert index.checkpoints == count - 1
+    assert index.digest(1900) == hash_256(data[:1900])
+    assert index.update() == 1
+    assert index.verify()
+
+
+@pytest.mark.skipif(log_index.fcntl is None, reason="нет fcntl.flock")
+def test_concurrent_writers_do_not_duplicate_records(tmp_path):
+    data = _data(2000)
+    path = _log(tmp_path, data)
+    first = PrefixIndex(path, interval=INTERVAL)
+    second = PrefixIndex(path, interval=INTERVAL)
+    first.update()
+    count = first.checkpoints
+    with open(path, "ab") as f:
+        f.write(data)
+
+    # Второй писатель ждёт блокировку, пока её держит "другой процесс"
+    with open(first.index_path, "rb") as held:
+        log_index.fcntl.flock(held.fileno(), log_index.fcntl.LOCK_EX)
+        added = []
+        writer = threading.Thread(target=lambda: added.append(second.update()))
+        writer.start()
+        writer.join(0.2)
+        assert writer.is_alive()
+        assert first.checkpoints == count
+        log_index.fcntl.flock(held.fileno(), log_index.fcntl.LOCK_UN)
+    writer.join()
+
+    assert first.update() == 0
+    assert added == [2 * len(data) // INTERVAL - count]
+    assert first.checkpoints == 2 * len(data) // INTERVAL
+    assert first.verify()
+
+
+def test_incomplete_header_is_treated_as_missing(tmp_path):
+    data = _data(1000)
+    path = _log(tmp_path, data)
+    index_path = tmp_path / "audit.log.sbidx"
+    for partial in (b"", b"SBIX\x01"):
+        index_path.write_bytes(partial)
+        index = PrefixIndex(path, interval=INTERVAL)
+        assert index.checkpoints == 0
+        assert index.digest(700) == hash_256(data[:700])
+        assert index.update() == 1000 // INTERVAL
+        assert index.verify()
+
+
+def test_header_written_by_another_writer_is_checked(tmp_path):
+    path = _log(tmp_path, _data(1000))
+    (tmp_path / "audit.log.sbidx").write_bytes(b"")
+    index = PrefixIndex(path, interval=INTERVAL)
+    PrefixIndex(path, interval=128).update()
+    with pytest.raises(ValueError):
+        index.update()
+
+
+def test_truncated_log_is_rejected(tmp_path):
+    data = _data(2000)
+    path = _log(tmp_path, data)
+    index = PrefixIndex(path, interval=INTERVAL)
+    index.update()
+    path.write_bytes(data[:500])
+    with pytest.raises(ValueError):
+        index.digest()
+    assert not index.verify()
+    index.rebuild()
+    assert index.digest() == hash_256(data[:500])
+
+
+def test_verify_detects_rewritten_prefix(tmp_path):
+    data = bytearray(_data(2000))
+    path = _log(tmp_path, bytes(data))
+    index = PrefixIndex(path, interval=INTERVAL)
+    index.update()
+    assert index.verify()
+    data[10] ^= 1
+    path.write_bytes(bytes(data))
+    assert not index.verify()
+
+
+def test_invalid_arguments(tmp_path):
+    path = _log(tmp_path, _data(100))
+    with pytest.raises(ValueError):
+        PrefixIndex(path, interval=100)
+    index = PrefixIndex(path, interval=INTERVAL)
+    with pytest.raises(ValueError):
+        index.digest(101)
+    (tmp_path / "other.idx").write_bytes(b"not an index at all")
+    with pytest.raises(ValueError):
+        PrefixIndex(path, index_path=tmp_path / "other.idx")
@@ -0,0 +1,102 @@
+"""
+Тесты древовидного режима (merkle.py)
+"""
+
+import random
+
+import pytest
+
+from merkle import (
+    MerkleTree,
+    leaf_hash,
+    merkle_root,
+    merkle_root_file,
+    node_hash,
+    verify_leaf,
+    verify_proof,
+)
+
+
+def _data(size):
+    rng = random.Random(size)
+    return bytes(rng.getrandbits(8) for _ in range(size))
+
+
+def test_small_trees_by_hand():
+    a, b, c = (leaf_hash(x) for x in (b"a" * 64, b"b" * 64, b"c"))
+    assert merkle_root(b"a" * 64, leaf_size=64) == a
+    assert merkle_root(b"a" * 64 + b"b" * 64, leaf_size=64) == node_hash(a, b)
+    assert merkle_root(b"a" * 64 + b"b" * 64 + b"c", leaf_size=64) == \
+        node_hash(node_hash(a, b), c)
+    assert merkle_root(b"", leaf_size=64) == leaf_hash(b"")
+
+
+def test_domain_separation():
+    # Лист с данными "левый||правый" не совпадает с внутренним узлом
+    a, b = leaf_hash(b"a"), leaf_hash(b"b")
+    assert leaf_hash(a + b) != node_hash(a, b)
+
+
+@pytest.mark.parametrize("leaves", [1, 2, 3, 7, 8, 13])
+def test_every_proof_verifies(leaves):
+    data = _data(64 * leaves - 5)
+    tree = MerkleTree.from_bytes(data, 512, leaf_size=64)
+    for index in range(tree.leaf_count):
+        chunk = data[index * 64:(index + 1) * 64]
+        proof = tree.proof(index)
+        assert verify_leaf(tree.root, chunk, proof, 512)
+        assert not verify_proof(tree.root, leaf_hash(b"forged", 512), proof, 512)
+
+
+def test_file_tree_matches_in_memory(tmp_path):
+    data = _data(64 * 40 + 3)
+    path = tmp_path / "obj"
+    path.write_bytes(data)
+    expected = merkle_root(data, leaf_size=128)
+    assert merkle_root_file(path, leaf_size=128, workers=1) == expected
+
+    import merkle
+    original = merkle.TASK_BYTES
+    merkle.TASK_BYTES = 512
+    try:
+        assert merkle_root_file(path, leaf_size=128, workers=2) == expected
+    finally:
+        merkle.TASK_BYTES = original
+
+
+def test_refresh_after_edit_and_append(tmp_path):
+    data = bytearray(_data(64 * 20))
+    path = tmp_path / "obj"
+    path.write_bytes(data)
+    tree = MerkleTree.from_file(path, leaf_size=128, workers=1)
+
+    data[300:310] = b"X" * 10
+    path.write_bytes(data)
+    assert tree.refresh_file(path, [(300, 310)]) == merkle_root(data, leaf_size=128)
+
+    data += b"tail" * 50
+    path.write_bytes(data)
+    assert tree.refresh_file(path, [(64 * 20, len(data))]) == \
+        merkle_root(data, leaf_size=128)
+
+    del data[500:]
+    path.write_bytes(data)
+    assert tree.refresh_file(path, []) == merkle_root(data, leaf_size=128)
+
+
+@pytest.mark.parametrize("old_size, new_size", [(1280, 1270), (1270, 1273)],
+                         ids=["shrink", "append"])
+def test_refresh_after_resize_with_same_leaf_count(tmp_path, old_size, new_size):
+    data = _data(1280)
+    path = tmp_path / "obj"
+    path.write_bytes(data[:old_size])
+    tree = MerkleTree.from_file(path, leaf_size=128, workers=1)
+
+    path.write_bytes(data[:new_size])
+    assert tree.refresh_file(path, []) == merkle_root(data[:new_size], leaf_size=128)
+    assert tree.leaf_count == 10
+
+
+def test_rejects_bad_leaf_size():
+    with pytest.raises(ValueError):
+        MerkleTree([leaf_hash(b"")], leaf_size=100)
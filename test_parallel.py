@@ -0,0 +1,77 @@
+"""
+Тесты параллельного хэширования (parallel.py)
+"""
+
+import random
+import threading
+
+import parallel
+from parallel import hash_files, hash_many, hash_many_threads, iter_hash_many
+from streebog import Streebog, hash_256, hash_512
+
+
+def _messages(count=40):
+    rng = random.Random(11)
+    return [bytes(rng.getrandbits(8) for _ in range(rng.randrange(0, 300)))
+            for _ in range(count)]
+
+
+def test_hash_many_in_order():
+    messages = _messages()
+    assert hash_many(messages, 512, workers=2) == [hash_512(m) for m in messages]
+
+
+def test_iter_hash_many_covers_all_indices():
+    messages = _messages(10)
+    results = dict(iter_hash_many(messages, 256, workers=2))
+    assert results == {i: hash_256(m) for i, m in enumerate(messages)}
+
+
+def test_shared_memory_and_buffer_inputs(monkeypatch):
+    monkeypatch.setattr(parallel, "SHARED_MEMORY_THRESHOLD", 100)
+    monkeypatch.setattr(parallel, "CHUNK_ITEMS", 3)
+    messages = [b"x" * 50, bytearray(b"y" * 150), memoryview(b"z" * 500), b""]
+    expected = [hash_256(bytes(m)) for m in messages]
+    assert hash_many(messages, 256, workers=2) == expected
+
+
+def test_hash_files(tmp_path):
+    messages = _messages(5)
+    paths = []
+    for i, message in enumerate(messages):
+        path = tmp_path / f"f{i}"
+        path.write_bytes(message)
+        paths.append(path)
+    assert hash_files(paths, 256, workers=2) == [hash_256(m) for m in messages]
+
+
+def test_hash_many_threads_in_order(monkeypatch):
+    monkeypatch.setattr(parallel, "THREAD_CHUNK_BYTES", 200)
+    messages = _messages() + [bytearray(b"y" * 300), memoryview(b"z" * 500)]
+    expected = [hash_512(bytes(m)) for m in messages]
+    assert hash_many_threads(messages, 512, workers=4) == expected
+
+
+def test_independent_hashers_in_threads():
+    messages = _messages(8)
+    results = [None] * len(messages)
+    barrier = threading.Barrier(len(messages))
+
+    def work(index):
+        hasher = Streebog(256)
+        barrier.wait()
+        # Порции по 7 байт: потоки перемежаются внутри update()
+        for start in range(0, len(messages[index]), 7):
+            hasher.update(messages[index][start:start + 7])
+        results[index] = hasher.digest()
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(len(messages))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [hash_256(m) for m in messages]
+
+
+def test_gil_enabled():
+    assert isinstance(parallel.gil_enabled(), bool)
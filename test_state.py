@@ -0,0 +1,46 @@
+"""
+Тесты экспорта/импорта состояния (Streebog.state_bytes / from_state)
+"""
+
+import pickle
+
+import pytest
+
+from streebog import STATE_MAGIC, Streebog, hash_256, hash_512
+
+
+@pytest.mark.parametrize("split", [0, 1, 63, 64, 65, 200])
+def test_resume_from_checkpoint(split):
+    data = bytes(range(256)) * 2
+    hasher = Streebog(512)
+    hasher.update(data[:split])
+    state = hasher.state_bytes()
+    assert len(state) <= 263
+
+    resumed = Streebog.from_state(state)
+    assert resumed.message_length == split
+    resumed.update(data[split:])
+    assert resumed.final() == hash_512(data)
+
+
+def test_state_keeps_out_bits_and_is_picklable():
+    hasher = Streebog(256, b"abc" * 50)
+    state = pickle.loads(pickle.dumps(hasher.state_bytes()))
+    assert Streebog.from_state(state).digest() == hash_256(b"abc" * 50)
+
+
+def test_rejects_bad_state():
+    state = Streebog(512, b"x" * 70).state_bytes()
+    with pytest.raises(ValueError):
+        Streebog.from_state(state[:-1])
+    with pytest.raises(ValueError):
+        Streebog.from_state(b"XXXX" + state[4:])
+    with pytest.raises(ValueError):
+        Streebog.from_state(STATE_MAGIC + b"\xff" + state[5:])
+
+
+def test_no_export_after_final():
+    hasher = Streebog(512)
+    hasher.final()
+    with pytest.raises(RuntimeError):
+        hasher.state_bytes()
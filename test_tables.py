@@ -0,0 +1,117 @@
+"""
+Тесты табличного LPS (tables.py) против эталонных примитивов
+"""
+
+import random
+import subprocess
+import sys
+
+from compression import g
+from primitives import LPS, l
+from tables import (
+    LPS_TABLES,
+    TABLES_PATH,
+    _read_blob,
+    LPS_table,
+    build_lps_tables,
+    load_lps_tables,
+    write_tables,
+)
+
+
+def test_tables_shape():
+    assert len(LPS_TABLES) == 8
+    assert all(len(table) == 256 for table in LPS_TABLES)
+    assert all(0 <= word < 2 ** 64 for table in LPS_TABLES for word in table)
+
+
+def test_shared_constants_are_immutable():
+    from constants import A_MATRIX, C_CONSTANTS, PI, TAU
+
+    for value in (A_MATRIX, C_CONSTANTS, LPS_TABLES, *LPS_TABLES):
+        assert isinstance(value, tuple)
+    assert all(isinstance(row, bytes) for row in A_MATRIX + C_CONSTANTS)
+    assert isinstance(PI, bytes) and isinstance(TAU, bytes)
+
+
+def test_rfc_example():
+    # RFC 6986: LPS(0^512) = (b383fc2eced4a574)^8
+    assert LPS_table(bytes(64)) == bytes.fromhex("b383fc2eced4a574") * 8
+
+
+def test_matches_reference_lps():
+    rng = random.Random(6986)
+    for _ in range(64):
+        a = bytes(rng.getrandbits(8) for _ in range(64))
+        assert LPS_table(a) == LPS(a)
+
+
+def test_single_byte_positions():
+    # Каждая позиция каждого байта отображается так же, как в эталоне
+    for pos in range(64):
+        for value in (0x00, 0x01, 0x80, 0xff):
+            a = bytearray(64)
+            a[pos] = value
+            assert LPS_table(bytes(a)) == LPS(bytes(a))
+
+
+def test_table_entry_is_l_of_substituted_byte():
+    from constants import PI
+    for k in range(8):
+        for x in (0, 1, 127, 255):
+            word = bytearray(8)
+            word[k] = PI[x]
+            assert LPS_TABLES[k][x] == int.from_bytes(l(bytes(word)), 'big')
+
+
+def _reference_g(N, h, m):
+    from constants import C_CONSTANTS
+    from primitives import X
+    from utils import xor_bytes
+    keys = [LPS(xor_bytes(h, N))]
+    for c in C_CONSTANTS:
+        keys.append(LPS(xor_bytes(keys[-1], c)))
+    state = m
+    for key in keys[:12]:
+        state = LPS(X(key, state))
+    state = X(keys[12], state)
+    return xor_bytes(xor_bytes(state, h), m)
+
+
+def test_compression_matches_reference():
+    rng = random.Random(34112)
+    for _ in range(4):
+        N, h, m = (bytes(rng.getrandbits(8) for _ in range(64)) for _ in range(3))
+        assert g(N, h, m) == _reference_g(N, h, m)
+
+
+def test_generated_blob_is_current():
+    # Поставляемый файл читается без отката к build_lps_tables()
+    assert _read_blob(TABLES_PATH) == build_lps_tables()
+
+
+def test_blob_roundtrip_and_fallback(tmp_path):
+    path = tmp_path / "tables.bin"
+    write_tables(str(path))
+    assert load_lps_tables(str(path)) == LPS_TABLES
+
+    # Устаревший или повреждённый файл не используется
+    original = path.read_bytes()
+    for position in (4, len(original) - 1):
+        blob = bytearray(original)
+        blob[position] ^= 1
+        path.write_bytes(blob)
+        assert _read_blob(str(path)) is None
+        assert load_lps_tables(str(path)) == LPS_TABLES
+    assert load_lps_tables(str(tmp_path / "missing.bin")) == LPS_TABLES
+
+
+def test_import_streebog_is_lazy():
+    code = (
+        "import sys, streebog; "
+        "print(sorted({'tables', 'int_compression', 'batch', 'numpy'}"
+        " & set(sys.modules)))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True,
+                         text=True, check=True).stdout
+    assert out.strip() == "[]"
@@ -0,0 +1,90 @@
+"""
+Тесты потокового Streebog.update на входах с buffer protocol
+"""
+
+import array
+import mmap
+import random
+import tracemalloc
+
+import pytest
+
+from streebog import Streebog, hash_256, hash_512
+
+
+def _data(size, seed=5):
+    rng = random.Random(seed)
+    return bytes(rng.getrandbits(8) for _ in range(size))
+
+
+def _stream(chunks, out_bits=512):
+    hasher = Streebog(out_bits)
+    for chunk in chunks:
+        hasher.update(chunk)
+    return hasher.final()
+
+
+@pytest.mark.parametrize("step", [1, 7, 63, 64, 65, 100, 1000])
+def test_odd_chunk_sizes(step):
+    data = _data(1000)
+    chunks = [data[i:i + step] for i in range(0, len(data), step)]
+    assert _stream(chunks) == hash_512(data)
+
+
+def test_buffer_protocol_inputs():
+    data = _data(300)
+    expected = hash_256(data)
+    assert _stream([bytearray(data)], 256) == expected
+    assert _stream([memoryview(data)], 256) == expected
+    assert _stream([memoryview(data)[:10], memoryview(data)[10:]], 256) == expected
+    # Несмежное представление не хэшируется молча как что-то другое
+    with pytest.raises(TypeError):
+        Streebog(256).update(memoryview(data)[::2])
+
+
+def test_multibyte_itemsize_is_flattened():
+    words = array.array('Q', range(40))
+    assert _stream([words]) == hash_512(words.tobytes())
+
+
+def test_mmap_input():
+    data = _data(4096 + 17)
+    with mmap.mmap(-1, len(data)) as mm:
+        mm.write(data)
+        assert _stream([mm]) == hash_512(data)
+
+
+def test_numpy_input():
+    np = pytest.importorskip("numpy")
+    arr = np.arange(100, dtype=np.uint32)
+    assert _stream([arr]) == hash_512(arr.tobytes())
+
+
+def test_only_tail_is_buffered():
+    hasher = Streebog(512)
+    hasher.update(b"a" * 1000)
+    assert len(hasher.buffer) == 1000 % 64
+    hasher.update(b"b" * 30)
+    assert len(hasher.buffer) == (1000 + 30) % 64
+
+
+def test_caller_buffer_can_be_resized_after_update():
+    data = bytearray(b"q" * 130)
+    hasher = Streebog(256)
+    hasher.update(data)
+    data.extend(b"more")  # memoryview не должен удерживать буфер
+    assert hasher.final() == hash_256(b"q" * 130)
+
+
+def test_steady_state_memory_does_not_grow_with_input():
+    data = bytes(32 << 10)
+    hasher = Streebog(512)
+    hasher.update(data[:4096])
+
+    tracemalloc.start()
+    try:
+        hasher.update(data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < 4096
@@ -54,6 +54,10 @@ def int_to_bytes(n: int, length: int) -> bytes:
 # АРИФМЕТИКА ПО МОДУЛЮ 2^512
 # ============================================================================
 
+# Маска для арифметики по модулю 2^512
+MASK_512 = (1 << 512) - 1
+
+
 def add_mod_2n_512(a: bytes, b: bytes) -> bytes:
     """
     Сложение двух 512-битных чисел по модулю 2^512.
@@ -77,8 +81,8 @@ def add_mod_2n_512(a: bytes, b: bytes) -> bytes:
     assert len(a) == 64, f"a должно быть 64 байта, получено {len(a)}"
     assert len(b) == 64, f"b должно быть 64 байта, получено {len(b)}"
     
-    # Преобразуем в числа, складываем, берём остаток
-    result = (bytes_to_int(a) + bytes_to_int(b)) % (2 ** 512)
+    # Преобразуем в числа, складываем, отбрасываем перенос за 2^512
+    result = (bytes_to_int(a) + bytes_to_int(b)) & MASK_512
     
     return int_to_bytes(result, 64)
 